@@ -0,0 +1,8 @@
+-- Migration: Add indexes used by the CMS listings and lookups
+-- Supports keyset pagination ordered by (lesson_id, "order", id) and the
+-- per-parent lookups done by the Streamlit CMS
+
+CREATE INDEX IF NOT EXISTS idx_units_course_order ON units(course_id, "order");
+CREATE INDEX IF NOT EXISTS idx_lessons_unit_order ON lessons(unit_id, "order");
+CREATE INDEX IF NOT EXISTS idx_challenges_lesson_order ON challenges(lesson_id, "order", id);
+CREATE INDEX IF NOT EXISTS idx_challenge_options_challenge_id ON challenge_options(challenge_id, id);
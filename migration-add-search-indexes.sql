@@ -0,0 +1,23 @@
+-- Migration: Add full-text search columns and indexes for the CMS search page
+-- Stored generated tsvector columns keep the stemmed text next to each row,
+-- so db_utils.search_content() filters and ranks without re-running
+-- to_tsvector() on every match. The configuration must match SEARCH_CONFIG.
+-- drizzle-kit push does not know these columns; run this file again after a push.
+
+ALTER TABLE challenges
+    ADD COLUMN IF NOT EXISTS search_vector tsvector
+    GENERATED ALWAYS AS (to_tsvector('spanish', question)) STORED;
+
+ALTER TABLE challenge_options
+    ADD COLUMN IF NOT EXISTS search_vector tsvector
+    GENERATED ALWAYS AS (to_tsvector('spanish', text)) STORED;
+
+CREATE INDEX IF NOT EXISTS idx_challenges_search_vector
+    ON challenges USING gin (search_vector);
+
+CREATE INDEX IF NOT EXISTS idx_challenge_options_search_vector
+    ON challenge_options USING gin (search_vector);
+
+-- Expression indexes used by the first version of the search page
+DROP INDEX IF EXISTS idx_challenges_question_fts;
+DROP INDEX IF EXISTS idx_challenge_options_text_fts;
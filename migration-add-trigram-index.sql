@@ -0,0 +1,7 @@
+-- Migration: Add trigram index for near-duplicate question detection
+-- Used by db_utils.find_similar_challenges() and find_duplicate_challenges()
+
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+CREATE INDEX IF NOT EXISTS idx_challenges_question_trgm
+    ON challenges USING gin (question gin_trgm_ops);
@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Prepared statement benchmark for FIBRA Content Management System
+Measures the per-call latency of the CMS's hottest queries with and without
+server-side prepared statements, against the database in DATABASE_URL.
+
+Usage:
+    python bench_prepared.py [--iterations 200] [--lesson-id 13]
+"""
+
+import argparse
+import os
+import statistics
+import time
+
+import psycopg2
+from psycopg2.extras import RealDictCursor
+
+import db_utils
+
+HOT_QUERIES = [
+    ("challenges por lección", "SELECT * FROM challenges WHERE lesson_id = %s ORDER BY \"order\""),
+    ("opciones por desafío", "SELECT * FROM challenge_options WHERE challenge_id = %s ORDER BY id"),
+    ("lecciones por unidad", "SELECT * FROM lessons WHERE unit_id = %s ORDER BY \"order\""),
+]
+
+def measure(cur, sql, params, iterations, prepared):
+    db_utils.PREPARED_STATEMENTS = prepared
+    db_utils.execute_prepared(cur, sql, params)  # warm-up (and PREPARE)
+    cur.fetchall()
+    timings = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        db_utils.execute_prepared(cur, sql, params)
+        cur.fetchall()
+        timings.append(time.perf_counter() - start)
+    return statistics.mean(timings) * 1000, statistics.median(timings) * 1000
+
+def main():
+    parser = argparse.ArgumentParser(description="Mide la latencia de las consultas más usadas con y sin sentencias preparadas")
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument("--lesson-id", type=int, default=13)
+    args = parser.parse_args()
+
+    conn = psycopg2.connect(
+        os.getenv('DATABASE_URL'),
+        cursor_factory=RealDictCursor,
+        connection_factory=db_utils.PreparedConnection
+    )
+    conn.autocommit = True
+    cur = conn.cursor()
+
+    # measure() toggles the module-wide flag; put it back afterwards
+    setting = db_utils.PREPARED_STATEMENTS
+    try:
+        print(f"{'Consulta':<26}{'Normal (ms)':>14}{'Preparada (ms)':>16}{'Ahorro (ms)':>14}")
+        for label, sql in HOT_QUERIES:
+            plain_mean, _ = measure(cur, sql, (args.lesson_id,), args.iterations, prepared=False)
+            prepared_mean, _ = measure(cur, sql, (args.lesson_id,), args.iterations, prepared=True)
+            print(f"{label:<26}{plain_mean:>14.3f}{prepared_mean:>16.3f}{plain_mean - prepared_mean:>14.3f}")
+    finally:
+        db_utils.PREPARED_STATEMENTS = setting
+        cur.close()
+        conn.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,214 @@
+"""
+Shared layout for the FIBRA CMS pages
+Page configuration, styles, sidebar status panels and helpers used by
+app.py and every script in pages/
+"""
+
+import time
+from typing import List, Dict, Optional, Any
+
+import streamlit as st
+
+import db_utils
+
+CUSTOM_CSS = """
+    <style>
+    .main-header {
+        font-size: 2.5rem;
+        font-weight: bold;
+        color: #1f77b4;
+        text-align: center;
+        margin-bottom: 2rem;
+    }
+    .section-header {
+        font-size: 1.8rem;
+        font-weight: bold;
+        color: #2c3e50;
+        margin-top: 2rem;
+        margin-bottom: 1rem;
+    }
+    .success-box {
+        padding: 1rem;
+        background-color: #d4edda;
+        border-left: 4px solid #28a745;
+        margin: 1rem 0;
+    }
+    .error-box {
+        padding: 1rem;
+        background-color: #f8d7da;
+        border-left: 4px solid #dc3545;
+        margin: 1rem 0;
+    }
+    </style>
+"""
+
+# Session state shared by all pages, initialised on the first run of a session
+SESSION_DEFAULTS = {
+    "run_timings": None,
+}
+
+def init_session():
+    """Set up the per-session state once; later reruns skip this"""
+    if st.session_state.get("session_ready"):
+        return
+    for key, value in SESSION_DEFAULTS.items():
+        st.session_state.setdefault(key, value)
+    st.session_state["session_ready"] = True
+
+def setup_page(title: str = "FIBRA CMS"):
+    """Common preamble of every page: configuration, styles, header and the
+    sidebar status panels. Stops the page if the database is unreachable."""
+    st.session_state["run_started"] = time.perf_counter()
+
+    st.set_page_config(
+        page_title=title,
+        page_icon="📚",
+        layout="wide",
+        initial_sidebar_state="expanded"
+    )
+    init_session()
+
+    st.markdown(CUSTOM_CSS, unsafe_allow_html=True)
+    st.markdown('<div class="main-header">📚 FIBRA - Sistema de Gestión de Contenido</div>', unsafe_allow_html=True)
+
+    # Database connection status (cached, refreshed in the background)
+    health = db_utils.get_db_health()
+    if health['ok']:
+        st.sidebar.success("✅ Conectado a la base de datos")
+        st.sidebar.caption(f"Comprobado hace {time.time() - health['checked_at']:.0f} s · {health['latency'] * 1000:.0f} ms")
+    else:
+        st.sidebar.error(f"❌ Error de conexión: {health['error']}")
+        st.error("No se puede conectar a la base de datos. Verifica tu archivo .env")
+        st.stop()
+
+    with st.sidebar.expander("🔌 Pool de conexiones"):
+        pool_stats = db_utils.get_pool_stats()
+        st.caption(f"En uso: {pool_stats['in_use']} / {pool_stats['max_size']}")
+        st.caption(f"Inactivas: {pool_stats['idle']}")
+        st.caption(f"Préstamos: {pool_stats['borrows']}")
+        st.caption(f"Espera media: {pool_stats['wait_time_avg'] * 1000:.1f} ms (máx. {pool_stats['wait_time_max'] * 1000:.1f} ms)")
+
+    with st.sidebar.expander("🗄️ Caché de consultas"):
+        cache_stats = db_utils.get_cache_stats()
+        st.caption(f"Entradas: {cache_stats['entries']} / {cache_stats['max_entries']}")
+        st.caption(f"Aciertos: {cache_stats['hits']} · Fallos: {cache_stats['misses']} ({cache_stats['hit_rate']:.0%} aciertos)")
+        st.caption(f"Invalidaciones: {cache_stats['invalidations']} · Desalojos: {cache_stats['evictions']}")
+        if st.button("🧹 Vaciar caché"):
+            db_utils.clear_cache()
+            st.rerun()
+
+def footer():
+    """Common footer of every page, with the script timings panel"""
+    st.markdown("---")
+    st.markdown("**FIBRA CMS** - Sistema de Gestión de Contenido Educativo")
+
+    # Script timings: first run of the session (startup) and the latest reruns
+    run_time = time.perf_counter() - st.session_state["run_started"]
+    timings = st.session_state["run_timings"]
+    if timings is None:
+        timings = st.session_state["run_timings"] = {"startup": run_time, "reruns": []}
+    else:
+        timings["reruns"] = (timings["reruns"] + [run_time])[-20:]
+    with st.sidebar.expander("⏱️ Rendimiento"):
+        st.caption(f"Inicio de sesión: {timings['startup'] * 1000:.0f} ms")
+        if timings["reruns"]:
+            reruns = timings["reruns"]
+            st.caption(f"Última ejecución: {reruns[-1] * 1000:.0f} ms")
+            st.caption(f"Media ({len(reruns)} ejecuciones): {sum(reruns) / len(reruns) * 1000:.0f} ms · máx. {max(reruns) * 1000:.0f} ms")
+
+# ==================== HELPERS ====================
+
+def page_cursor(state_key: str):
+    """Keyset cursor of the page being shown for a paginated listing (None for the first page)"""
+    return st.session_state.setdefault(state_key, [None])[-1]
+
+def page_navigation(state_key: str, next_cursor):
+    """Previous/next buttons for a paginated listing"""
+    stack = st.session_state.setdefault(state_key, [None])
+    col1, col2, col3 = st.columns([1, 2, 1])
+    with col1:
+        if st.button("⬅️ Anterior", key=f"{state_key}_prev", disabled=len(stack) == 1):
+            stack.pop()
+            st.rerun()
+    with col2:
+        st.caption(f"Página {len(stack)}")
+    with col3:
+        if st.button("Siguiente ➡️", key=f"{state_key}_next", disabled=next_cursor is None):
+            stack.append(next_cursor)
+            st.rerun()
+
+def reorder_editor(items: List[Dict[str, Any]], label_key: str, state_key: str) -> Optional[List[int]]:
+    """Editable ordering of `items` (dicts with id and `label_key`), listed in
+    their current order. Rows move by typing a new position, e.g. 2.5 to put
+    a row between the 2nd and 3rd. Returns the ids in the new order when the
+    user saves, None otherwise."""
+    import pandas as pd
+
+    version = st.session_state.setdefault(f"{state_key}_version", 0)
+    table = pd.DataFrame({
+        "Posición": [float(i) for i in range(1, len(items) + 1)],
+        "Elemento": [item[label_key] for item in items],
+        "ID": [item['id'] for item in items],
+    })
+    edited = st.data_editor(
+        table,
+        key=f"{state_key}_{version}",
+        hide_index=True,
+        use_container_width=True,
+        disabled=["Elemento", "ID"],
+        column_config={"Posición": st.column_config.NumberColumn(step=0.5, required=True)},
+    )
+    new_order = [int(i) for i in edited.sort_values("Posición", kind="stable")["ID"]]
+    moved = sum(1 for old, new in zip(table["ID"], new_order) if old != new)
+    if moved:
+        st.caption(f"{moved} elementos cambiarán de posición")
+    if st.button("💾 Guardar orden", key=f"{state_key}_save", disabled=not moved):
+        # A new editor key drops the edits once the saved order is reloaded
+        st.session_state[f"{state_key}_version"] = version + 1
+        return new_order
+    return None
+
+# What a cascading delete removes, in the order shown to the user
+DELETE_IMPACT_LABELS = [
+    ("units", "unidades"),
+    ("lessons", "lecciones"),
+    ("challenges", "desafíos"),
+    ("options", "opciones"),
+    ("exams", "exámenes"),
+    ("exam_lessons", "lecciones de exámenes"),
+    ("progress", "progresos de usuarios"),
+    ("exam_results", "resultados de exámenes"),
+    ("active_users", "usuarios con el curso activo"),
+]
+
+def delete_button(kind: str, node_id: int, key: str):
+    """🗑️ button of a course, unit or lesson row; computes the delete impact
+    that delete_confirmation() then shows"""
+    if st.button("🗑️ Eliminar", key=key):
+        st.session_state[f"{key}_impact"] = db_utils.get_delete_impact(kind, node_id)
+
+def delete_confirmation(kind: str, node_id: int, title: str, key: str) -> bool:
+    """Impact preview and confirmation of a delete requested with
+    delete_button(). Returns True once the subtree has been deleted."""
+    impact = st.session_state.get(f"{key}_impact")
+    if impact is None:
+        return False
+
+    affected = [f"{impact[k]} {label}" for k, label in DELETE_IMPACT_LABELS if impact.get(k)]
+    message = f"Se eliminará **{title}**"
+    if affected:
+        message += " junto con: " + ", ".join(affected)
+    st.warning(message)
+    backup = st.checkbox("📸 Crear un respaldo antes de eliminar", value=sum(impact.values()) > 0, key=f"{key}_backup")
+    if st.button("✅ Confirmar eliminación", key=f"{key}_confirm"):
+        if backup:
+            import snapshots
+            with st.spinner("Creando respaldo..."):
+                snapshots.create_snapshot(f"Antes de eliminar {title}")
+        db_utils.delete_subtree(kind, node_id)
+        del st.session_state[f"{key}_impact"]
+        return True
+    if st.button("Cancelar", key=f"{key}_cancel"):
+        del st.session_state[f"{key}_impact"]
+        st.rerun()
+    return False
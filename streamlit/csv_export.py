@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Content export for FIBRA Content Management System
+Streams a course subtree (or the whole catalog) out of PostgreSQL with
+COPY TO, one file per table, as CSV in the upload-template format, JSONL or
+Parquet. Rows flow straight from the server to disk, so memory use does not
+grow with the size of the catalog.
+
+Usage:
+    python csv_export.py salida/ [--course-id 1] [--format csv|jsonl|parquet] [--zip]
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+import zipfile
+from typing import Dict, Optional, Any, Callable, IO
+
+import db_utils
+from csv_import import IMPORT_SPECS
+
+EXPORT_FORMATS = ("csv", "jsonl", "parquet")
+# Bytes of COPY output converted per Parquet batch
+PARQUET_BLOCK_SIZE = 8 << 20
+
+# Tables in dependency order: column -> kind (same kinds as csv_import)
+EXPORT_TABLES: Dict[str, Dict[str, str]] = {
+    spec["table"]: {"id": "int", **spec["columns"]} for spec in IMPORT_SPECS.values()
+}
+EXPORT_TABLES["exams"] = {"id": "int", "title": "text", "description": "text", "course_id": "int", "order": "int"}
+EXPORT_TABLES["exam_lessons"] = {"id": "int", "exam_id": "int", "lesson_id": "int", "order": "int"}
+
+# Rows of each table that belong to course %(course_id)s
+_LESSONS_OF_COURSE = "SELECT l.id FROM lessons l JOIN units u ON u.id = l.unit_id WHERE u.course_id = %(course_id)s"
+COURSE_FILTERS = {
+    "courses": "id = %(course_id)s",
+    "units": "course_id = %(course_id)s",
+    "lessons": "unit_id IN (SELECT id FROM units WHERE course_id = %(course_id)s)",
+    "challenges": f"lesson_id IN ({_LESSONS_OF_COURSE})",
+    "challenge_options": f"challenge_id IN (SELECT c.id FROM challenges c WHERE c.lesson_id IN ({_LESSONS_OF_COURSE}))",
+    "exams": "course_id = %(course_id)s",
+    "exam_lessons": "exam_id IN (SELECT id FROM exams WHERE course_id = %(course_id)s)",
+}
+
+def _select(session, table: str, course_id: Optional[int], as_text: bool = True) -> str:
+    """SELECT of the table's export columns, restricted to the course when given"""
+    columns = []
+    for column, kind in EXPORT_TABLES[table].items():
+        # Templates spell booleans true/false and enums as their label
+        cast = "::text" if as_text and kind in ("bool", "challenge_type") else ""
+        columns.append(f'"{column}"{cast} AS "{column}"')
+    sql = f"SELECT {', '.join(columns)} FROM {table}"
+    if course_id is not None:
+        sql += " WHERE " + session.mogrify(COURSE_FILTERS[table], {"course_id": course_id}).decode()
+    return sql + " ORDER BY id"
+
+def _copy_csv(session, select: str, out: IO[bytes]) -> int:
+    session.copy_expert(f"COPY ({select}) TO STDOUT WITH (FORMAT csv, HEADER)", out)
+    return session.rowcount
+
+def _copy_jsonl(session, select: str, out: IO[bytes]) -> int:
+    # CSV mode with control characters as quote/delimiter leaves the JSON
+    # text untouched (text mode would double every backslash)
+    session.copy_expert(
+        f"COPY (SELECT row_to_json(x) FROM ({select}) x) TO STDOUT "
+        f"WITH (FORMAT csv, QUOTE E'\\x01', DELIMITER E'\\x02')",
+        out
+    )
+    return session.rowcount
+
+def _arrow_types(table: str):
+    import pyarrow as pa
+
+    types = {"int": pa.int32(), "bool": pa.bool_(), "text": pa.string(), "challenge_type": pa.string()}
+    return {column: types[kind] for column, kind in EXPORT_TABLES[table].items()}
+
+def _copy_parquet(session, select: str, out: IO[bytes], table: str) -> int:
+    try:
+        import pyarrow.csv as pa_csv
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise Exception("Parquet export requires pyarrow (pip install pyarrow)")
+
+    # COPY to a temporary CSV, then convert it block by block
+    with tempfile.TemporaryFile() as staged:
+        rows = _copy_csv(session, select, staged)
+        staged.seek(0)
+        reader = pa_csv.open_csv(
+            staged,
+            read_options=pa_csv.ReadOptions(block_size=PARQUET_BLOCK_SIZE),
+            convert_options=pa_csv.ConvertOptions(
+                column_types=_arrow_types(table),
+                true_values=["true"],
+                false_values=["false"],
+                strings_can_be_null=True,
+                quoted_strings_can_be_null=False,
+            ),
+        )
+        with pq.ParquetWriter(out, reader.schema) as writer:
+            for batch in reader:
+                writer.write_batch(batch)
+    return rows
+
+def _export_table(session, table: str, course_id: Optional[int], fmt: str, out: IO[bytes]) -> int:
+    if fmt == "jsonl":
+        return _copy_jsonl(session, _select(session, table, course_id, as_text=False), out)
+    select = _select(session, table, course_id)
+    if fmt == "csv":
+        return _copy_csv(session, select, out)
+    return _copy_parquet(session, select, out, table)
+
+def export_course(
+    out_dir: str,
+    course_id: Optional[int] = None,
+    fmt: str = "csv",
+    on_progress: Optional[Callable[[str, int], None]] = None,
+) -> Dict[str, Any]:
+    """Export a course subtree (the whole catalog when course_id is None)
+    into `out_dir`, one <table>.<fmt> file per table.
+
+    All tables are read from one repeatable-read snapshot, so the files are
+    consistent with each other. `on_progress` is called after each table with
+    its name and row count. Returns a dict with `files` (list of dicts with
+    table, path, rows and bytes) and `elapsed` seconds.
+    """
+    if fmt not in EXPORT_FORMATS:
+        raise Exception(f"Unknown export format: {fmt}")
+    start = time.perf_counter()
+    os.makedirs(out_dir, exist_ok=True)
+    files = []
+    with db_utils.transaction() as session:
+        session.execute("SET TRANSACTION ISOLATION LEVEL REPEATABLE READ READ ONLY")
+        for table in EXPORT_TABLES:
+            path = os.path.join(out_dir, f"{table}.{fmt}")
+            with open(path, "wb") as out:
+                rows = _export_table(session, table, course_id, fmt, out)
+            files.append({"table": table, "path": path, "rows": rows, "bytes": os.path.getsize(path)})
+            if on_progress:
+                on_progress(table, rows)
+    return {"files": files, "elapsed": time.perf_counter() - start}
+
+def export_course_zip(
+    out: IO[bytes],
+    course_id: Optional[int] = None,
+    fmt: str = "csv",
+    on_progress: Optional[Callable[[str, int], None]] = None,
+) -> Dict[str, Any]:
+    """Export like export_course() and pack the files into a zip archive written to `out`"""
+    with tempfile.TemporaryDirectory() as tmp:
+        result = export_course(tmp, course_id, fmt, on_progress)
+        with zipfile.ZipFile(out, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+            for f in result["files"]:
+                archive.write(f["path"], arcname=os.path.basename(f["path"]))
+    return result
+
+def main():
+    parser = argparse.ArgumentParser(description="Exporta un curso (o todo el catálogo) a CSV, JSONL o Parquet")
+    parser.add_argument("output", help="directorio de salida (o archivo .zip con --zip)")
+    parser.add_argument("--course-id", type=int, help="curso a exportar; por defecto, todo el catálogo")
+    parser.add_argument("--format", choices=EXPORT_FORMATS, default="csv")
+    parser.add_argument("--zip", action="store_true", help="empaquetar los archivos en un .zip")
+    args = parser.parse_args()
+
+    def report(table, rows):
+        print(f"  {table:<20} {rows:>10} filas")
+
+    if args.zip:
+        with open(args.output, "wb") as out:
+            result = export_course_zip(out, args.course_id, args.format, report)
+    else:
+        result = export_course(args.output, args.course_id, args.format, report)
+    total = sum(f["rows"] for f in result["files"])
+    print(f"{total} filas exportadas a {args.output} en {result['elapsed']:.2f} s")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,570 @@
+"""
+CSV import engine for FIBRA Content Management System
+Streams uploaded CSV files into PostgreSQL with COPY, validates them in a
+staging table and merges them into the target table in one transaction
+"""
+
+import csv
+import io
+import time
+from typing import List, Dict, Optional, Any, Callable, IO
+
+import db_utils
+
+# Rows sent per COPY chunk (and per progress update)
+CHUNK_SIZE = 5000
+
+CHALLENGE_TYPES = ("SELECT", "ASSIST", "LISTEN")
+TRUE_VALUES = ("true", "t", "1", "yes")
+BOOL_VALUES = TRUE_VALUES + ("false", "f", "0", "no")
+# Bounds of the PostgreSQL integer type used by every id and order column
+INT_MIN, INT_MAX = -2**31, 2**31 - 1
+
+# Column kinds: text, int, bool, challenge_type. `unique` lists (parent,
+# position) column pairs that should not repeat within one file (checked by
+# preflight_csv)
+IMPORT_SPECS: Dict[str, Dict[str, Any]] = {
+    "Cursos": {
+        "table": "courses",
+        "columns": {"title": "text", "image_src": "text"},
+        "required": ["title", "image_src"],
+        "references": {},
+    },
+    "Unidades": {
+        "table": "units",
+        "columns": {"title": "text", "description": "text", "course_id": "int", "order": "int"},
+        "required": ["title", "description", "course_id", "order"],
+        "references": {"course_id": "courses"},
+        "unique": [("course_id", "order")],
+    },
+    "Lecciones": {
+        "table": "lessons",
+        "columns": {"title": "text", "unit_id": "int", "order": "int"},
+        "required": ["title", "unit_id", "order"],
+        "references": {"unit_id": "units"},
+        "unique": [("unit_id", "order")],
+    },
+    "Desafíos": {
+        "table": "challenges",
+        "columns": {"lesson_id": "int", "type": "challenge_type", "question": "text", "order": "int", "audio_src": "text"},
+        "required": ["lesson_id", "type", "question", "order"],
+        "references": {"lesson_id": "lessons"},
+        "unique": [("lesson_id", "order")],
+    },
+    "Opciones de Respuesta": {
+        "table": "challenge_options",
+        "columns": {"challenge_id": "int", "text": "text", "correct": "bool", "image_src": "text", "audio_src": "text"},
+        "required": ["challenge_id", "text", "correct"],
+        "references": {"challenge_id": "challenges"},
+    },
+}
+
+class _ValidationFailed(Exception):
+    """Raised inside the import transaction to roll it back (invalid rows or a preview)"""
+
+def _quote(column: str) -> str:
+    return f'"{column}"'
+
+def _cast(column: str, kind: str) -> str:
+    """SQL expression converting a staged text column to its target type"""
+    col = f"s.{_quote(column)}"
+    if kind == "int":
+        return f"trim({col})::integer"
+    if kind == "bool":
+        return f"lower(trim({col})) IN ({', '.join(repr(v) for v in TRUE_VALUES)})"
+    if kind == "challenge_type":
+        return f'upper(trim({col}))::"type"'
+    return f"NULLIF({col}, '')"
+
+def _in_range(col: str) -> str:
+    """SQL condition: the staged value is an integer that fits the integer type.
+    CASE keeps the casts from running on values that are not plain digits."""
+    return (
+        f"CASE WHEN trim({col}) ~ '^-?[0-9]{{1,10}}$' "
+        f"THEN trim({col})::bigint BETWEEN {INT_MIN} AND {INT_MAX} ELSE false END"
+    )
+
+def _validation_query(spec: Dict[str, Any]) -> str:
+    """One query returning (row_num, column, error) for every invalid staged value"""
+    checks = []
+    for column, kind in spec["columns"].items():
+        col = f"s.{_quote(column)}"
+        if column in spec["required"]:
+            checks.append(
+                f"SELECT row_num, '{column}' AS column_name, 'Valor obligatorio vacío' AS error FROM import_staging s "
+                f"WHERE {col} IS NULL OR trim({col}) = ''"
+            )
+        if kind == "int":
+            checks.append(
+                f"SELECT row_num, '{column}' AS column_name, 'No es un número entero: ' || {col} AS error FROM import_staging s "
+                f"WHERE trim({col}) <> '' AND trim({col}) !~ '^-?[0-9]+$'"
+            )
+            checks.append(
+                f"SELECT row_num, '{column}' AS column_name, 'Número fuera de rango: ' || {col} AS error FROM import_staging s "
+                f"WHERE trim({col}) ~ '^-?[0-9]+$' AND NOT ({_in_range(col)})"
+            )
+        elif kind == "bool":
+            checks.append(
+                f"SELECT row_num, '{column}' AS column_name, 'No es un valor booleano: ' || {col} AS error FROM import_staging s "
+                f"WHERE trim({col}) <> '' AND lower(trim({col})) NOT IN ({', '.join(repr(v) for v in BOOL_VALUES)})"
+            )
+        elif kind == "challenge_type":
+            checks.append(
+                f"SELECT row_num, '{column}' AS column_name, 'Tipo de desafío inválido: ' || {col} AS error FROM import_staging s "
+                f"WHERE trim({col}) <> '' AND upper(trim({col})) NOT IN ({', '.join(repr(v) for v in CHALLENGE_TYPES)})"
+            )
+    for column, parent in spec["references"].items():
+        col = f"s.{_quote(column)}"
+        checks.append(
+            f"SELECT row_num, '{column}' AS column_name, 'No existe en {parent}: ' || {col} AS error FROM import_staging s "
+            f"WHERE {_in_range(col)} "
+            f"AND NOT EXISTS (SELECT 1 FROM {parent} p WHERE p.id = CASE WHEN {_in_range(col)} THEN trim({col})::integer END)"
+        )
+    return " UNION ALL ".join(checks) + " ORDER BY 1, 2"
+
+def _stage_chunk(session, columns: List[str], rows: List[List[Optional[str]]]):
+    """COPY one chunk of parsed rows into the staging table"""
+    buffer = io.StringIO()
+    csv.writer(buffer).writerows(rows)
+    buffer.seek(0)
+    session.copy_expert(
+        f"COPY import_staging (row_num, {', '.join(_quote(c) for c in columns)}) FROM STDIN WITH (FORMAT csv)",
+        buffer
+    )
+
+def _open_csv(file: IO[bytes]):
+    """Wrap an uploaded file for streaming; returns (text, reader, header, total_bytes)"""
+    file.seek(0, io.SEEK_END)
+    total_bytes = file.tell() or 1
+    file.seek(0)
+    text = io.TextIOWrapper(file, encoding="utf-8-sig", newline="")
+    reader = csv.reader(text)
+    header = [h.strip() for h in next(reader, [])]
+    return text, reader, header, total_bytes
+
+def _stage_file(
+    session,
+    file: IO[bytes],
+    reader,
+    header: List[str],
+    columns: List[str],
+    total_bytes: int,
+    chunk_size: int,
+    on_progress: Optional[Callable[[int, float], None]],
+) -> int:
+    """Create the staging table and COPY every row of the file into it.
+    Returns the number of rows staged."""
+    session.execute(
+        "CREATE TEMP TABLE import_staging (row_num integer, "
+        + ", ".join(f"{_quote(c)} text" for c in columns)
+        + ") ON COMMIT DROP"
+    )
+    positions = {c: header.index(c) for c in columns if c in header}
+    rows = 0
+    chunk = []
+    for row in reader:
+        if not any(row):
+            continue
+        rows += 1
+        chunk.append([rows] + [
+            row[positions[c]] if c in positions and positions[c] < len(row) else None
+            for c in columns
+        ])
+        if len(chunk) >= chunk_size:
+            _stage_chunk(session, columns, chunk)
+            chunk = []
+            if on_progress:
+                on_progress(rows, min(file.tell() / total_bytes, 1.0))
+    if chunk:
+        _stage_chunk(session, columns, chunk)
+    if on_progress:
+        on_progress(rows, 1.0)
+    return rows
+
+def _missing_columns(spec: Dict[str, Any], header: List[str]) -> List[Dict[str, Any]]:
+    return [{"row": 0, "column": c, "error": "Columna faltante en el archivo"} for c in spec["required"] if c not in header]
+
+def _fetch_errors(session, spec: Dict[str, Any]) -> List[Dict[str, Any]]:
+    session.execute(_validation_query(spec))
+    return [
+        {"row": r["row_num"], "column": r["column_name"], "error": r["error"]}
+        for r in session.fetchall()
+    ]
+
+def import_csv(
+    file: IO[bytes],
+    upload_type: str,
+    chunk_size: int = CHUNK_SIZE,
+    on_progress: Optional[Callable[[int, float], None]] = None,
+) -> Dict[str, Any]:
+    """Import an uploaded CSV file into the table for `upload_type`.
+
+    The file is streamed in chunks into a temporary staging table, checked
+    for missing values, bad types and unknown foreign keys, and inserted
+    into the target table only if every row is valid. `on_progress` is
+    called after each chunk with the rows staged so far and the fraction of
+    the file read.
+
+    Returns a dict with `rows`, `inserted`, `errors` (list of dicts with
+    row, column and error) and `elapsed` seconds.
+    """
+    spec = IMPORT_SPECS[upload_type]
+    columns = list(spec["columns"])
+    start = time.perf_counter()
+    result = {"rows": 0, "inserted": 0, "errors": [], "elapsed": 0.0}
+
+    text, reader, header, total_bytes = _open_csv(file)
+    result["errors"] = _missing_columns(spec, header)
+    if result["errors"]:
+        text.detach()
+        return result
+
+    try:
+        with db_utils.transaction() as session:
+            result["rows"] = _stage_file(session, file, reader, header, columns, total_bytes, chunk_size, on_progress)
+            result["errors"] = _fetch_errors(session, spec)
+            if result["errors"]:
+                raise _ValidationFailed()
+
+            session.execute(
+                f"INSERT INTO {spec['table']} ({', '.join(_quote(c) for c in columns)}) "
+                f"SELECT {', '.join(_cast(c, kind) for c, kind in spec['columns'].items())} "
+                f"FROM import_staging s ORDER BY s.row_num"
+            )
+            result["inserted"] = session.rowcount
+            db_utils.invalidate(spec["table"], session=session)
+    except _ValidationFailed:
+        pass
+    finally:
+        text.detach()
+
+    result["elapsed"] = time.perf_counter() - start
+    return result
+
+# ==================== SYNC IMPORT ====================
+
+def _stored(column: str, kind: str) -> str:
+    """Stored value normalised like _cast() normalises the staged one"""
+    col = f"t.{_quote(column)}"
+    return f"NULLIF({col}, '')" if kind == "text" else col
+
+def _sync_spec(spec: Dict[str, Any]) -> Dict[str, Any]:
+    """Import spec with the optional `id` column used to match stored rows"""
+    return {**spec, "columns": {"id": "int", **spec["columns"]}}
+
+def _duplicate_id_query() -> str:
+    return (
+        "SELECT row_num, 'id' AS column_name, 'Id repetido en el archivo: ' || s.id AS error FROM import_staging s "
+        "WHERE trim(s.id) IN (SELECT trim(id) FROM import_staging WHERE trim(id) <> '' GROUP BY 1 HAVING count(*) > 1) "
+        "ORDER BY 1"
+    )
+
+def _blank_to_none(value: Any) -> Any:
+    return None if value == "" else value
+
+def _describe(row: Dict[str, Any], columns: List[str]) -> str:
+    return " · ".join(f"{c}: {row[c]}" for c in columns if row.get(c) not in (None, ""))
+
+def sync_csv(
+    file: IO[bytes],
+    upload_type: str,
+    apply: bool = False,
+    delete_missing: bool = False,
+    chunk_size: int = CHUNK_SIZE,
+    on_progress: Optional[Callable[[int, float], None]] = None,
+) -> Dict[str, Any]:
+    """Compare an uploaded CSV file with the stored rows and, with `apply`,
+    write only the differences.
+
+    Rows are matched by their `id` column. Each row is hashed (md5 of its
+    typed values) and compared with the hash of the stored row, so every
+    row is classified as insert (no id or unknown id), update, unchanged,
+    or delete (stored rows under the same parents as the file, e.g. the
+    challenges of the lessons it mentions, that the file no longer lists).
+    Deletes are only applied with `delete_missing`. Everything runs in one
+    transaction that is rolled back when `apply` is False.
+
+    Returns a dict with `rows`, `errors`, `inserted`, `updated`,
+    `unchanged`, `deleted` (counts), `changes` (list of dicts with action,
+    row, id and detail), `applied` and `elapsed` seconds.
+    """
+    spec = _sync_spec(IMPORT_SPECS[upload_type])
+    table = spec["table"]
+    data_columns = [c for c in spec["columns"] if c != "id"]
+    columns = list(spec["columns"])
+    parent = next(iter(spec["references"]), None)
+    start = time.perf_counter()
+    result = {
+        "rows": 0, "errors": [], "inserted": 0, "updated": 0, "unchanged": 0, "deleted": 0,
+        "changes": [], "applied": False, "elapsed": 0.0,
+    }
+
+    text, reader, header, total_bytes = _open_csv(file)
+    result["errors"] = _missing_columns(spec, header)
+    if result["errors"]:
+        text.detach()
+        return result
+
+    quoted = ", ".join(_quote(c) for c in data_columns)
+    typed = ", ".join(f"{_cast(c, spec['columns'][c])} AS {_quote(c)}" for c in data_columns)
+    incoming_hash = "md5(ROW(" + ", ".join(f"i.{_quote(c)}" for c in data_columns) + ")::text)"
+    stored_hash = "md5(ROW(" + ", ".join(_stored(c, spec["columns"][c]) for c in data_columns) + ")::text)"
+
+    try:
+        with db_utils.transaction() as session:
+            result["rows"] = _stage_file(session, file, reader, header, columns, total_bytes, chunk_size, on_progress)
+            result["errors"] = _fetch_errors(session, spec)
+            session.execute(_duplicate_id_query())
+            result["errors"] += [
+                {"row": r["row_num"], "column": r["column_name"], "error": r["error"]}
+                for r in session.fetchall()
+            ]
+            if result["errors"]:
+                raise _ValidationFailed()
+
+            # Classify every incoming row against the stored one with the same id
+            session.execute(
+                f"CREATE TEMP TABLE import_diff ON COMMIT DROP AS "
+                f"SELECT i.*, CASE WHEN t.id IS NULL THEN 'insert' "
+                f"WHEN {stored_hash} = {incoming_hash} THEN 'unchanged' ELSE 'update' END AS action, "
+                f"to_jsonb(t) AS stored "
+                f"FROM (SELECT s.row_num, NULLIF(trim(s.id), '')::integer AS id, {typed} FROM import_staging s) i "
+                f"LEFT JOIN {table} t ON t.id = i.id"
+            )
+            session.execute("SELECT * FROM import_diff WHERE action <> 'unchanged' ORDER BY row_num")
+            for r in session.fetchall():
+                if r["action"] == "update":
+                    detail = " · ".join(
+                        f"{c}: {r['stored'][c]} → {r[c]}" for c in data_columns
+                        if _blank_to_none(r["stored"][c]) != _blank_to_none(r[c])
+                    )
+                else:
+                    detail = _describe(r, data_columns)
+                result["changes"].append({"action": r["action"], "row": r["row_num"], "id": r["id"], "detail": detail})
+                result["inserted" if r["action"] == "insert" else "updated"] += 1
+            session.execute("SELECT count(*) AS n FROM import_diff WHERE action = 'unchanged'")
+            result["unchanged"] = session.fetchone()["n"]
+
+            if parent:
+                session.execute(
+                    f"SELECT t.* FROM {table} t "
+                    f"WHERE t.{_quote(parent)} IN (SELECT {_quote(parent)} FROM import_diff) "
+                    f"AND NOT EXISTS (SELECT 1 FROM import_diff i WHERE i.id = t.id) ORDER BY t.id"
+                )
+                for r in session.fetchall():
+                    result["changes"].append({"action": "delete", "row": None, "id": r["id"], "detail": _describe(r, data_columns)})
+                    result["deleted"] += 1
+
+            if not apply:
+                raise _ValidationFailed()
+
+            # Upsert rows that carry an id, plain insert for new rows without one
+            session.execute(
+                f"INSERT INTO {table} (id, {quoted}) "
+                f"SELECT id, {quoted} FROM import_diff WHERE action <> 'unchanged' AND id IS NOT NULL ORDER BY row_num "
+                f"ON CONFLICT (id) DO UPDATE SET "
+                + ", ".join(f"{_quote(c)} = EXCLUDED.{_quote(c)}" for c in data_columns)
+            )
+            # Explicit ids may be ahead of the sequence: move it past them before
+            # rows without an id draw from it, never backwards
+            session.execute(
+                f"SELECT setval(pg_get_serial_sequence(%(table)s, 'id'), GREATEST("
+                f"(SELECT COALESCE(last_value, 0) FROM pg_sequences "
+                f"WHERE (schemaname || '.' || sequencename)::regclass = pg_get_serial_sequence(%(table)s, 'id')::regclass), "
+                f"(SELECT COALESCE(MAX(id), 0) FROM {table}), 1))",
+                {"table": table}
+            )
+            session.execute(
+                f"INSERT INTO {table} ({quoted}) "
+                f"SELECT {quoted} FROM import_diff WHERE action = 'insert' AND id IS NULL ORDER BY row_num"
+            )
+            if delete_missing and result["deleted"]:
+                session.execute(
+                    f"DELETE FROM {table} WHERE id = ANY(%s)",
+                    ([c["id"] for c in result["changes"] if c["action"] == "delete"],)
+                )
+            else:
+                result["deleted"] = 0
+                result["changes"] = [c for c in result["changes"] if c["action"] != "delete"]
+
+            # Deletes cascade to child tables
+            for invalidated in (db_utils.CONTENT_TABLES if result["deleted"] else (table,)):
+                db_utils.invalidate(invalidated, session=session)
+            result["applied"] = True
+    except _ValidationFailed:
+        pass
+    finally:
+        text.detach()
+
+    result["elapsed"] = time.perf_counter() - start
+    return result
+
+def changes_to_csv(changes: List[Dict[str, Any]]) -> str:
+    """Render a sync preview as a downloadable CSV report"""
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=["action", "row", "id", "detail"])
+    writer.writeheader()
+    writer.writerows(changes)
+    return buffer.getvalue()
+
+def errors_to_csv(errors: List[Dict[str, Any]]) -> str:
+    """Render an error list as a downloadable CSV report"""
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=["row", "column", "error"])
+    writer.writeheader()
+    writer.writerows(errors)
+    return buffer.getvalue()
+
+# ==================== PRE-FLIGHT VALIDATION ====================
+# The same checks as the staging-table validation plus content rules, run on
+# the whole file with vectorized pandas operations before anything is
+# written, so every problem is reported at once. Errors block the upload;
+# warnings (repeated positions, challenges without exactly one correct
+# option) are reported but do not.
+
+INT_PATTERN = r"-?[0-9]+"
+
+def _read_frame(file: IO[bytes]):
+    """The whole file as stripped strings, indexed by the row numbers the
+    staging table would give (blank rows skipped, first data row = 1)"""
+    import pandas as pd
+    from pandas.errors import EmptyDataError
+
+    file.seek(0)
+    try:
+        frame = pd.read_csv(file, dtype=str, keep_default_na=False, encoding="utf-8-sig")
+    except EmptyDataError:
+        frame = pd.DataFrame()
+    finally:
+        file.seek(0)
+    frame = pd.DataFrame({str(c).strip(): frame[c].str.strip() for c in frame.columns})
+    if len(frame.columns):
+        frame = frame[(frame != "").any(axis=1)]
+    frame.index = pd.RangeIndex(1, len(frame) + 1)
+    return frame
+
+def _as_int(values):
+    """Integer values of a column (NaN where the value is not an integer)"""
+    return values.where(values.str.fullmatch(INT_PATTERN, na=False)).astype("float64")
+
+def _flag(mask, column: str, error) -> List[Dict[str, Any]]:
+    """Report rows where `mask` is true; `error` is a message or a Series of messages"""
+    rows = mask.index[mask.to_numpy()]
+    if isinstance(error, str):
+        return [{"row": int(r), "column": column, "error": error} for r in rows]
+    return [{"row": int(r), "column": column, "error": e} for r, e in zip(rows, error[mask])]
+
+def _existing_ids(table: str, ids: List[int], session=None) -> List[int]:
+    if not ids:
+        return []
+    with db_utils.db_cursor(session) as cur:
+        cur.execute(f"SELECT id FROM {table} WHERE id = ANY(%s)", (ids,))
+        return [r["id"] for r in cur.fetchall()]
+
+def _stored_correct_options(challenge_ids: List[int], replaced_ids: List[int], session=None) -> Dict[int, int]:
+    """Correct options already stored per challenge, leaving out the option rows the file replaces"""
+    if not challenge_ids:
+        return {}
+    with db_utils.db_cursor(session) as cur:
+        cur.execute(
+            "SELECT challenge_id, count(*) FILTER (WHERE correct) AS correct FROM challenge_options "
+            "WHERE challenge_id = ANY(%s) AND NOT (id = ANY(%s)) GROUP BY challenge_id",
+            (challenge_ids, replaced_ids)
+        )
+        return {r["challenge_id"]: r["correct"] for r in cur.fetchall()}
+
+def _correct_option_warnings(frame, ints, sync: bool, session=None) -> List[Dict[str, Any]]:
+    """Challenges that would end up with zero or several correct options"""
+    import pandas as pd
+
+    challenge = ints["challenge_id"]
+    correct = frame["correct"].str.lower().isin(TRUE_VALUES)
+    in_file = correct.groupby(challenge).sum()
+    if in_file.empty:
+        return []
+    replaced = ints["id"].dropna().astype(int).tolist() if sync and "id" in ints else []
+    stored = _stored_correct_options(in_file.index.astype(int).tolist(), replaced, session)
+    totals = in_file.add(pd.Series(stored, dtype="int64"), fill_value=0)
+    totals = totals[totals.index.isin(in_file.index) & (totals != 1)]
+    first_row = frame.index.to_series().groupby(challenge).min()
+
+    warnings = []
+    for challenge_id, count in totals.items():
+        if count == 0:
+            error = f"El desafío {int(challenge_id)} no tiene ninguna opción correcta"
+        else:
+            error = f"El desafío {int(challenge_id)} tiene {int(count)} opciones correctas"
+        warnings.append({"row": int(first_row[challenge_id]), "column": "correct", "error": error})
+    return warnings
+
+def preflight_csv(file: IO[bytes], upload_type: str, sync: bool = False, session=None) -> Dict[str, Any]:
+    """Validate a whole uploaded CSV file before writing anything.
+
+    Checks required columns and values, value types, challenge types,
+    foreign keys (one query per parent table), ids repeated in the file
+    (with `sync`), positions repeated under the same parent in the file
+    and, for answer options, challenges left with zero or several correct
+    options counting the options already stored.
+
+    Returns a dict with `rows`, `errors` and `warnings` (lists of dicts with
+    row, column and error) and `elapsed` seconds.
+    """
+    import pandas as pd
+
+    spec = IMPORT_SPECS[upload_type]
+    if sync:
+        spec = _sync_spec(spec)
+    start = time.perf_counter()
+    frame = _read_frame(file)
+    result = {"rows": len(frame), "errors": _missing_columns(spec, list(frame.columns)), "warnings": [], "elapsed": 0.0}
+    if result["errors"]:
+        result["elapsed"] = time.perf_counter() - start
+        return result
+
+    # Each integer column is parsed once and shared by the checks below
+    ints = {c: _as_int(frame[c]) for c, kind in spec["columns"].items() if kind == "int" and c in frame}
+    errors = []
+    for column, kind in spec["columns"].items():
+        if column not in frame:
+            continue
+        values = frame[column]
+        filled = values != ""
+        if column in spec["required"]:
+            errors += _flag(~filled, column, "Valor obligatorio vacío")
+        if kind == "int":
+            errors += _flag(filled & ints[column].isna(), column, "No es un número entero: " + values)
+            in_range = ints[column].between(INT_MIN, INT_MAX)
+            errors += _flag(ints[column].notna() & ~in_range, column, "Número fuera de rango: " + values)
+            ints[column] = ints[column].where(in_range)
+        elif kind == "bool":
+            errors += _flag(filled & ~values.str.lower().isin(BOOL_VALUES), column, "No es un valor booleano: " + values)
+        elif kind == "challenge_type":
+            errors += _flag(filled & ~values.str.upper().isin(CHALLENGE_TYPES), column, "Tipo de desafío inválido: " + values)
+
+    for column, parent in spec["references"].items():
+        ids = ints[column]
+        found = _existing_ids(parent, ids.dropna().unique().astype(int).tolist(), session)
+        errors += _flag(ids.notna() & ~ids.isin(found), column, f"No existe en {parent}: " + frame[column])
+
+    if sync and "id" in frame:
+        ids = ints["id"]
+        errors += _flag(ids.notna() & ids.duplicated(keep=False), "id", "Id repetido en el archivo: " + frame["id"])
+
+    warnings = []
+    for parent_column, column in spec.get("unique", []):
+        if parent_column not in frame or column not in frame:
+            continue
+        keys = pd.DataFrame({parent_column: ints[parent_column], column: ints[column]})
+        repeated = keys.notna().all(axis=1) & keys.duplicated(keep=False)
+        warnings += _flag(
+            repeated, column,
+            f"Posición repetida en el archivo ({parent_column} " + frame[parent_column] + f", {column} " + frame[column] + ")"
+        )
+
+    if spec["table"] == "challenge_options":
+        warnings += _correct_option_warnings(frame, ints, sync, session)
+
+    result["errors"] = sorted(errors, key=lambda e: (e["row"], e["column"]))
+    result["warnings"] = sorted(warnings, key=lambda e: (e["row"], e["column"]))
+    result["elapsed"] = time.perf_counter() - start
+    return result
@@ -0,0 +1,76 @@
+"""
+Concurrent read API for FIBRA Content Management System
+Runs independent db_utils reads at the same time on pooled connections, so
+a page waits for its slowest query instead of the sum of all of them
+"""
+
+import asyncio
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional, Any, Callable
+
+import db_utils
+
+# psycopg2 is blocking, so each read runs on a worker thread with its own
+# pooled connection; never more workers than the pool can serve at once
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(max_workers=db_utils.POOL_MAX_SIZE, thread_name_prefix="db-read")
+    return _executor
+
+async def run(func: Callable[..., Any], *args, **kwargs) -> Any:
+    """Await any db_utils function without blocking the event loop"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_get_executor(), functools.partial(func, *args, **kwargs))
+
+async def gather(*calls: Callable[[], Any]) -> List[Any]:
+    """Run zero-argument callables concurrently; results come back in call order"""
+    return list(await asyncio.gather(*(run(call) for call in calls)))
+
+def load_concurrently(*calls: Callable[[], Any]) -> List[Any]:
+    """Sync facade for scripts such as app.py: run independent reads at the
+    same time and return their results in call order.
+
+        exam_lessons, lessons = db_async.load_concurrently(
+            lambda: db_utils.get_exam_lessons(exam_id),
+            lambda: db_utils.list_lessons(course_id=course_id),
+        )
+    """
+    if len(calls) <= 1:
+        return [call() for call in calls]
+    futures = [_get_executor().submit(call) for call in calls]
+    return [future.result() for future in futures]
+
+def _async_variant(func: Callable[..., Any]) -> Callable[..., Any]:
+    @functools.wraps(func)
+    async def wrapper(*args, **kwargs):
+        return await run(func, *args, **kwargs)
+    return wrapper
+
+# Async variants of the db_utils read API, e.g. `await db_async.get_units(course_id)`
+get_courses = _async_variant(db_utils.get_courses)
+get_units = _async_variant(db_utils.get_units)
+get_lessons = _async_variant(db_utils.get_lessons)
+get_challenges = _async_variant(db_utils.get_challenges)
+get_challenge_options = _async_variant(db_utils.get_challenge_options)
+get_challenge_options_batch = _async_variant(db_utils.get_challenge_options_batch)
+get_lesson_challenge_options = _async_variant(db_utils.get_lesson_challenge_options)
+get_exams = _async_variant(db_utils.get_exams)
+get_exam_lessons = _async_variant(db_utils.get_exam_lessons)
+get_exam_lesson_counts = _async_variant(db_utils.get_exam_lesson_counts)
+list_courses = _async_variant(db_utils.list_courses)
+list_units = _async_variant(db_utils.list_units)
+list_lessons = _async_variant(db_utils.list_lessons)
+list_challenges = _async_variant(db_utils.list_challenges)
+get_challenges_page = _async_variant(db_utils.get_challenges_page)
+get_challenge_options_page = _async_variant(db_utils.get_challenge_options_page)
+search_content = _async_variant(db_utils.search_content)
+get_course_tree = _async_variant(db_utils.get_course_tree)
+get_content_stats = _async_variant(db_utils.get_content_stats)
@@ -4,378 +4,1467 @@ Provides connection and CRUD operations for PostgreSQL database
 """
 
 import os
+import re
+import functools
+import hashlib
+import inspect
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
 import psycopg2
-from psycopg2.extras import RealDictCursor
-from typing import List, Dict, Optional, Any
+import psycopg2.errors
+from psycopg2 import pool as pg_pool
+from psycopg2.extensions import connection as pg_connection
+from psycopg2.extras import RealDictCursor, execute_values
+from typing import List, Dict, Optional, Any, Callable, Tuple
 from dotenv import load_dotenv
 
 # Load environment variables
 load_dotenv()
 
-def get_db_connection():
-    """Create and return a database connection"""
-    try:
-        conn = psycopg2.connect(
-            os.getenv('DATABASE_URL'),
-            cursor_factory=RealDictCursor
-        )
+# Pool sizing, overridable from .env
+POOL_MIN_SIZE = int(os.getenv('DB_POOL_MIN', '1'))
+POOL_MAX_SIZE = int(os.getenv('DB_POOL_MAX', '10'))
+# Seconds to wait for a free connection before giving up
+POOL_TIMEOUT = float(os.getenv('DB_POOL_TIMEOUT', '30'))
+# Connections idle longer than this are pinged before being handed out
+POOL_CHECK_AFTER = float(os.getenv('DB_POOL_CHECK_AFTER', '30'))
+# Rows per multi-row INSERT statement in the bulk functions
+BULK_PAGE_SIZE = 1000
+# Read cache: seconds an entry stays valid and maximum number of entries
+CACHE_ENABLED = os.getenv('DB_CACHE_ENABLED', '1') == '1'
+CACHE_TTL = float(os.getenv('DB_CACHE_TTL', '60'))
+CACHE_MAX_ENTRIES = int(os.getenv('DB_CACHE_MAX_ENTRIES', '512'))
+# Seconds the home page statistics are reused before querying again
+STATS_TTL = 30
+# Rows per page in the keyset-paginated listings
+PAGE_SIZE = 25
+# Server-side prepared statements for hot CRUD queries. Transaction poolers
+# (PgBouncer, Neon "-pooler" hosts) hand each transaction a different server
+# session, so they are off by default there; DB_PREPARED_STATEMENTS overrides
+PREPARED_STATEMENTS = os.getenv(
+    'DB_PREPARED_STATEMENTS', '0' if '-pooler' in os.getenv('DATABASE_URL', '') else '1'
+) == '1'
+# Seconds a successful connectivity check is reused before probing again
+HEALTH_TTL = float(os.getenv('DB_HEALTH_TTL', '15'))
+
+# ==================== CONNECTION POOL ====================
+
+class PreparedConnection(pg_connection):
+    """Connection that remembers which statements it has prepared"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.prepared: set = set()
+
+class ConnectionPool:
+    """Thread-safe connection pool with a health check on borrow.
+
+    Wraps psycopg2's ThreadedConnectionPool, adding a bounded wait for a
+    free connection (instead of failing when the pool is exhausted) and
+    usage counters for sizing.
+    """
+
+    def __init__(self, dsn: str, min_size: int, max_size: int, timeout: float, check_after: float):
+        try:
+            self._pool = pg_pool.ThreadedConnectionPool(
+                min_size, max_size, dsn,
+                cursor_factory=RealDictCursor,
+                connection_factory=PreparedConnection
+            )
+        except Exception as e:
+            raise Exception(f"Error connecting to database: {str(e)}")
+        self.min_size = min_size
+        self.max_size = max_size
+        self.timeout = timeout
+        self.check_after = check_after
+        self._slots = threading.BoundedSemaphore(max_size)
+        self._lock = threading.Lock()
+        self._returned_at: Dict[int, float] = {}
+        self._in_use = 0
+        self._borrows = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+        self._health_failures = 0
+
+    def _is_healthy(self, conn) -> bool:
+        """Check a connection before handing it out"""
+        if conn.closed:
+            return False
+        returned_at = self._returned_at.get(id(conn))
+        if returned_at is None or time.monotonic() - returned_at < self.check_after:
+            return True
+        try:
+            with conn.cursor() as cur:
+                cur.execute("SELECT 1")
+            return True
+        except psycopg2.Error:
+            return False
+
+    def getconn(self):
+        """Borrow a connection, waiting up to `timeout` seconds for a free slot"""
+        start = time.perf_counter()
+        if not self._slots.acquire(timeout=self.timeout):
+            raise Exception(f"Timed out after {self.timeout}s waiting for a database connection")
+        waited = time.perf_counter() - start
+        try:
+            conn = self._pool.getconn()
+            if not self._is_healthy(conn):
+                with self._lock:
+                    self._health_failures += 1
+                self._pool.putconn(conn, close=True)
+                conn = self._pool.getconn()
+            conn.autocommit = True
+        except Exception as e:
+            self._slots.release()
+            raise Exception(f"Error connecting to database: {str(e)}")
+        with self._lock:
+            self._in_use += 1
+            self._borrows += 1
+            self._wait_total += waited
+            self._wait_max = max(self._wait_max, waited)
         return conn
-    except Exception as e:
-        raise Exception(f"Error connecting to database: {str(e)}")
+
+    def putconn(self, conn):
+        """Return a borrowed connection to the pool"""
+        try:
+            self._returned_at[id(conn)] = time.monotonic()
+            self._pool.putconn(conn, close=bool(conn.closed))
+        finally:
+            with self._lock:
+                self._in_use -= 1
+            self._slots.release()
+
+    def stats(self) -> Dict[str, Any]:
+        """Snapshot of pool usage"""
+        with self._lock:
+            return {
+                'min_size': self.min_size,
+                'max_size': self.max_size,
+                'in_use': self._in_use,
+                'idle': len(self._pool._pool),
+                'borrows': self._borrows,
+                'wait_time_total': self._wait_total,
+                'wait_time_avg': self._wait_total / self._borrows if self._borrows else 0.0,
+                'wait_time_max': self._wait_max,
+                'health_check_failures': self._health_failures,
+            }
+
+    def close(self):
+        """Close every connection held by the pool"""
+        self._pool.closeall()
+
+_pool: Optional[ConnectionPool] = None
+_pool_lock = threading.Lock()
+
+def get_pool() -> ConnectionPool:
+    """Return the process-wide connection pool, creating it on first use"""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ConnectionPool(
+                    os.getenv('DATABASE_URL'),
+                    POOL_MIN_SIZE,
+                    POOL_MAX_SIZE,
+                    POOL_TIMEOUT,
+                    POOL_CHECK_AFTER,
+                )
+    return _pool
+
+def close_pool():
+    """Close the process-wide pool (it is recreated on next use)"""
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.close()
+            _pool = None
+
+def get_pool_stats() -> Dict[str, Any]:
+    """Get usage statistics of the connection pool"""
+    return get_pool().stats()
+
+@contextmanager
+def get_connection():
+    """Borrow a pooled connection for the duration of a `with` block.
+
+    Pooled connections run in autocommit mode, so each statement is
+    committed on its own.
+    """
+    db_pool = get_pool()
+    conn = db_pool.getconn()
+    try:
+        yield conn
+    finally:
+        db_pool.putconn(conn)
+
+@contextmanager
+def db_cursor(session: Optional[RealDictCursor] = None):
+    """Yield a cursor: the session's own cursor when one is given,
+    otherwise a fresh cursor on a pooled connection"""
+    if session is not None:
+        yield session
+        return
+    with get_connection() as conn:
+        cur = conn.cursor()
+        try:
+            yield cur
+        finally:
+            cur.close()
+
+class Session(RealDictCursor):
+    """Cursor handed out by transaction(); remembers the cache
+    invalidations to repeat once the transaction ends"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.pending_invalidations: List[Tuple[str, Optional[List[Any]]]] = []
+
+@contextmanager
+def transaction():
+    """Run several operations as one unit of work.
+
+    Yields a session (a cursor on a single pooled connection) that can be
+    passed as `session=` to any CRUD function. Everything is committed once
+    when the block exits, or rolled back if it raises.
+
+        with db_utils.transaction() as session:
+            challenge_id = db_utils.create_challenge(..., session=session)
+            db_utils.create_challenge_option(challenge_id, ..., session=session)
+    """
+    with get_connection() as conn:
+        conn.autocommit = False
+        cur = conn.cursor(cursor_factory=Session)
+        try:
+            yield cur
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            cur.close()
+            if not conn.closed:
+                conn.autocommit = True
+            for table, keys in cur.pending_invalidations:
+                _cache.invalidate(table, keys)
+
+# ==================== HEALTH PROBE ====================
+
+class HealthProbe:
+    """Database connectivity status, refreshed in the background.
+
+    status() answers from the last successful probe; once it is older than
+    `ttl` a daemon thread probes again while callers keep the cached result.
+    Only the first call, or a call after a failed probe, waits for the database.
+    """
+
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._status: Optional[Dict[str, Any]] = None
+        self._refreshing = False
+        self.probes = 0
+
+    def probe(self) -> Dict[str, Any]:
+        """Check connectivity now and cache the result"""
+        start = time.perf_counter()
+        try:
+            with get_connection() as conn:
+                with conn.cursor() as cur:
+                    cur.execute("SELECT 1")
+            ok, error = True, None
+        except Exception as e:
+            ok, error = False, str(e)
+        status = {
+            'ok': ok,
+            'error': error,
+            'latency': time.perf_counter() - start,
+            'checked_at': time.time(),
+        }
+        with self._lock:
+            self._status = status
+            self._refreshing = False
+            self.probes += 1
+        return status
+
+    def status(self) -> Dict[str, Any]:
+        """Get the cached status, scheduling a background probe when stale"""
+        with self._lock:
+            status = self._status
+            refresh = (
+                status is not None and status['ok'] and not self._refreshing
+                and time.time() - status['checked_at'] >= self.ttl
+            )
+            if refresh:
+                self._refreshing = True
+        if status is None or not status['ok']:
+            return self.probe()
+        if refresh:
+            threading.Thread(target=self.probe, name="db-health", daemon=True).start()
+        return status
+
+_health = HealthProbe(HEALTH_TTL)
+
+def get_db_health() -> Dict[str, Any]:
+    """Get the database connectivity status: ok, error, latency (seconds)
+    and checked_at (epoch seconds) of the last probe"""
+    return _health.status()
+
+# ==================== PREPARED STATEMENTS ====================
+
+def _statement_name(sql: str) -> str:
+    return "fibra_" + hashlib.md5(sql.encode('utf-8')).hexdigest()[:16]
+
+def execute_prepared(cur, sql: str, params: Tuple = (), retry: bool = True):
+    """Execute `sql` (with %s placeholders) as a server-side prepared statement.
+
+    The statement is prepared once per pooled connection and then run by
+    name, so the server skips parsing and planning on later calls. Falls
+    back to a plain execute when PREPARED_STATEMENTS is off, or when the
+    server session lost the statement twice in a row (a transaction pooler).
+    """
+    conn = cur.connection
+    if not PREPARED_STATEMENTS or not isinstance(conn, PreparedConnection):
+        cur.execute(sql, params or None)
+        return
+    name = _statement_name(sql)
+    if name not in conn.prepared:
+        placeholders = iter(range(1, sql.count('%s') + 1))
+        cur.execute(f"PREPARE {name} AS " + re.sub(r'%s', lambda m: f"${next(placeholders)}", sql))
+        conn.prepared.add(name)
+    execute = f"EXECUTE {name} ({', '.join(['%s'] * len(params))})" if params else f"EXECUTE {name}"
+    try:
+        cur.execute(execute, params or None)
+    except psycopg2.errors.FeatureNotSupported:
+        # "cached plan must not change result type": the table changed shape
+        # since the statement was prepared. Re-prepare when outside a transaction.
+        if not conn.autocommit:
+            raise
+        cur.execute(f"DEALLOCATE {name}")
+        conn.prepared.discard(name)
+        execute_prepared(cur, sql, params, retry)
+    except psycopg2.errors.InvalidSqlStatementName:
+        # "prepared statement does not exist": the server session changed
+        # under us (pooler or reconnect). Forget it and prepare again.
+        conn.prepared.discard(name)
+        if not conn.autocommit:
+            raise
+        if retry:
+            execute_prepared(cur, sql, params, retry=False)
+        else:
+            cur.execute(sql, params or None)
+
+# ==================== QUERY CACHE ====================
+
+class QueryCache:
+    """Bounded LRU cache of read results with a TTL and tag-based invalidation.
+
+    Every entry carries tags `(table, key)`: `key` is the value of the
+    filter the read used (e.g. the unit_id of `get_lessons(unit_id)`) or
+    None when the read depends on the whole table. A write invalidates the
+    entries tagged with the keys it touched plus the whole-table entries.
+    """
+
+    def __init__(self, max_entries: int, ttl: float):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: "OrderedDict[Any, Tuple[Any, float, List[Tuple[str, Any]]]]" = OrderedDict()
+        self._tags: Dict[str, Dict[Any, set]] = {}
+        self._lock = threading.Lock()
+        self._generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    @property
+    def generation(self) -> int:
+        return self._generation
+
+    def get(self, key) -> Tuple[bool, Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[1] > time.monotonic():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return True, entry[0]
+            if entry is not None:
+                self._remove(key)
+            self.misses += 1
+            return False, None
+
+    def set(self, key, value, tags: List[Tuple[str, Any]], ttl: Optional[float], generation: int):
+        """Store a value unless something was invalidated since `generation`"""
+        with self._lock:
+            if generation != self._generation:
+                return
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (value, time.monotonic() + (self.ttl if ttl is None else ttl), tags)
+            for table, tag_key in tags:
+                self._tags.setdefault(table, {}).setdefault(tag_key, set()).add(key)
+            while len(self._entries) > self.max_entries:
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+
+    def _remove(self, key):
+        _, _, tags = self._entries.pop(key)
+        for table, tag_key in tags:
+            keys = self._tags.get(table, {}).get(tag_key)
+            if keys is not None:
+                keys.discard(key)
+
+    def invalidate(self, table: str, keys: Optional[List[Any]] = None):
+        """Drop entries of `table` tagged with `keys` (all of them when keys is None)"""
+        with self._lock:
+            self._generation += 1
+            by_key = self._tags.get(table, {})
+            if keys is None:
+                doomed = set().union(*by_key.values()) if by_key else set()
+            else:
+                doomed = set(by_key.get(None, set()))
+                for tag_key in keys:
+                    doomed |= by_key.get(tag_key, set())
+            for key in doomed:
+                if key in self._entries:
+                    self._remove(key)
+                    self.invalidations += 1
+
+    def clear(self):
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
+            self._tags.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'ttl': self.ttl,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+                'evictions': self.evictions,
+                'invalidations': self.invalidations,
+            }
+
+_cache = QueryCache(CACHE_MAX_ENTRIES, CACHE_TTL)
+
+def cached(tags: Callable[[Dict[str, Any]], List[Tuple[str, Any]]], ttl: Optional[float] = None):
+    """Cache a read function by its arguments.
+
+    `tags` receives the bound arguments and returns the `(table, key)` tags
+    the result depends on. Calls made with a session bypass the cache so a
+    transaction always sees its own writes. Cached results are shared, so
+    callers must not mutate them.
+    """
+    def decorator(func):
+        signature = inspect.signature(func)
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            arguments = dict(bound.arguments)
+            if not CACHE_ENABLED or arguments.pop('session', None) is not None:
+                return func(*args, **kwargs)
+            key = (func.__name__,) + tuple(
+                tuple(v) if isinstance(v, list) else v for v in arguments.values()
+            )
+            found, value = _cache.get(key)
+            if found:
+                return value
+            generation = _cache.generation
+            value = func(*args, **kwargs)
+            _cache.set(key, value, tags(arguments), ttl, generation)
+            return value
+        return wrapper
+    return decorator
+
+def invalidate(table: str, *keys: Any, session: Optional[RealDictCursor] = None):
+    """Invalidate cached reads of `table` for the given filter keys.
+
+    With no keys every cached read of the table is dropped. Inside a
+    transaction the invalidation is repeated after commit/rollback so reads
+    made meanwhile from other connections cannot leave stale entries.
+    """
+    key_list = [k for k in keys if k is not None] if keys else None
+    _cache.invalidate(table, key_list)
+    if isinstance(session, Session):
+        session.pending_invalidations.append((table, key_list))
+
+def get_cache_stats() -> Dict[str, Any]:
+    """Get hit/miss counters of the query cache"""
+    return _cache.stats()
+
+def clear_cache():
+    """Drop every cached read"""
+    _cache.clear()
+
+# Tables edited through the CMS, parents first
+CONTENT_TABLES = ('courses', 'units', 'lessons', 'challenges', 'challenge_options', 'exams', 'exam_lessons')
+
+def _whole(*tables: str) -> List[Tuple[str, Any]]:
+    return [(table, None) for table in tables]
 
 # ==================== COURSES ====================
 
-def get_courses() -> List[Dict]:
+@cached(lambda a: _whole('courses'))
+def get_courses(session: Optional[RealDictCursor] = None) -> List[Dict]:
     """Get all courses"""
-    conn = get_db_connection()
-    cur = conn.cursor()
-    cur.execute("SELECT * FROM courses ORDER BY id")
-    courses = cur.fetchall()
-    cur.close()
-    conn.close()
-    return courses
-
-def create_course(title: str, image_src: str) -> int:
+    with db_cursor(session) as cur:
+        execute_prepared(cur, "SELECT * FROM courses ORDER BY id")
+        return cur.fetchall()
+
+def create_course(title: str, image_src: str, session: Optional[RealDictCursor] = None) -> int:
     """Create a new course"""
-    conn = get_db_connection()
-    cur = conn.cursor()
-    cur.execute(
-        "INSERT INTO courses (title, image_src) VALUES (%s, %s) RETURNING id",
-        (title, image_src)
-    )
-    course_id = cur.fetchone()['id']
-    conn.commit()
-    cur.close()
-    conn.close()
+    with db_cursor(session) as cur:
+        execute_prepared(cur,
+            "INSERT INTO courses (title, image_src) VALUES (%s, %s) RETURNING id",
+            (title, image_src)
+        )
+        course_id = cur.fetchone()['id']
+    invalidate('courses', course_id, session=session)
     return course_id
 
-def update_course(course_id: int, title: str, image_src: str):
+def update_course(course_id: int, title: str, image_src: str, session: Optional[RealDictCursor] = None):
     """Update an existing course"""
-    conn = get_db_connection()
-    cur = conn.cursor()
-    cur.execute(
-        "UPDATE courses SET title = %s, image_src = %s WHERE id = %s",
-        (title, image_src, course_id)
-    )
-    conn.commit()
-    cur.close()
-    conn.close()
-
-def delete_course(course_id: int):
-    """Delete a course"""
-    conn = get_db_connection()
-    cur = conn.cursor()
-    cur.execute("DELETE FROM courses WHERE id = %s", (course_id,))
-    conn.commit()
-    cur.close()
-    conn.close()
+    with db_cursor(session) as cur:
+        execute_prepared(cur,
+            "UPDATE courses SET title = %s, image_src = %s WHERE id = %s",
+            (title, image_src, course_id)
+        )
+    invalidate('courses', course_id, session=session)
+
+def delete_course(course_id: int, session: Optional[RealDictCursor] = None):
+    """Delete a course and everything under it (see delete_subtree)"""
+    delete_subtree('course', course_id, session)
 
 # ==================== UNITS ====================
 
-def get_units(course_id: Optional[int] = None) -> List[Dict]:
+@cached(lambda a: [('units', a['course_id'] or None)])
+def get_units(course_id: Optional[int] = None, session: Optional[RealDictCursor] = None) -> List[Dict]:
     """Get all units or units for a specific course"""
-    conn = get_db_connection()
-    cur = conn.cursor()
-    if course_id:
-        cur.execute(
-            "SELECT * FROM units WHERE course_id = %s ORDER BY \"order\"",
-            (course_id,)
-        )
-    else:
-        cur.execute("SELECT * FROM units ORDER BY course_id, \"order\"")
-    units = cur.fetchall()
-    cur.close()
-    conn.close()
-    return units
+    with db_cursor(session) as cur:
+        if course_id:
+            execute_prepared(cur,
+                "SELECT * FROM units WHERE course_id = %s ORDER BY \"order\"",
+                (course_id,)
+            )
+        else:
+            execute_prepared(cur, "SELECT * FROM units ORDER BY course_id, \"order\"")
+        return cur.fetchall()
 
-def create_unit(title: str, description: str, course_id: int, order: int) -> int:
+def create_unit(title: str, description: str, course_id: int, order: int, session: Optional[RealDictCursor] = None) -> int:
     """Create a new unit"""
-    conn = get_db_connection()
-    cur = conn.cursor()
-    cur.execute(
-        "INSERT INTO units (title, description, course_id, \"order\") VALUES (%s, %s, %s, %s) RETURNING id",
-        (title, description, course_id, order)
-    )
-    unit_id = cur.fetchone()['id']
-    conn.commit()
-    cur.close()
-    conn.close()
+    with db_cursor(session) as cur:
+        execute_prepared(cur,
+            "INSERT INTO units (title, description, course_id, \"order\") VALUES (%s, %s, %s, %s) RETURNING id",
+            (title, description, course_id, order)
+        )
+        unit_id = cur.fetchone()['id']
+    invalidate('units', course_id, session=session)
     return unit_id
 
-def update_unit(unit_id: int, title: str, description: str, course_id: int, order: int):
+def update_unit(unit_id: int, title: str, description: str, course_id: int, order: int, session: Optional[RealDictCursor] = None):
     """Update an existing unit"""
-    conn = get_db_connection()
-    cur = conn.cursor()
-    cur.execute(
-        "UPDATE units SET title = %s, description = %s, course_id = %s, \"order\" = %s WHERE id = %s",
-        (title, description, course_id, order, unit_id)
-    )
-    conn.commit()
-    cur.close()
-    conn.close()
-
-def delete_unit(unit_id: int):
-    """Delete a unit"""
-    conn = get_db_connection()
-    cur = conn.cursor()
-    cur.execute("DELETE FROM units WHERE id = %s", (unit_id,))
-    conn.commit()
-    cur.close()
-    conn.close()
+    with db_cursor(session) as cur:
+        execute_prepared(cur,
+            """
+            UPDATE units u SET title = %s, description = %s, course_id = %s, "order" = %s
+            FROM units old WHERE u.id = %s AND old.id = u.id
+            RETURNING old.course_id
+            """,
+            (title, description, course_id, order, unit_id)
+        )
+        old = cur.fetchone()
+    invalidate('units', course_id, old['course_id'] if old else None, session=session)
+
+def delete_unit(unit_id: int, session: Optional[RealDictCursor] = None):
+    """Delete a unit and everything under it (see delete_subtree)"""
+    delete_subtree('unit', unit_id, session)
 
 # ==================== LESSONS ====================
 
-def get_lessons(unit_id: Optional[int] = None) -> List[Dict]:
+@cached(lambda a: [('lessons', a['unit_id'] or None)])
+def get_lessons(unit_id: Optional[int] = None, session: Optional[RealDictCursor] = None) -> List[Dict]:
     """Get all lessons or lessons for a specific unit"""
-    conn = get_db_connection()
-    cur = conn.cursor()
-    if unit_id:
-        cur.execute(
-            "SELECT * FROM lessons WHERE unit_id = %s ORDER BY \"order\"",
-            (unit_id,)
-        )
-    else:
-        cur.execute("SELECT * FROM lessons ORDER BY unit_id, \"order\"")
-    lessons = cur.fetchall()
-    cur.close()
-    conn.close()
-    return lessons
+    with db_cursor(session) as cur:
+        if unit_id:
+            execute_prepared(cur,
+                "SELECT * FROM lessons WHERE unit_id = %s ORDER BY \"order\"",
+                (unit_id,)
+            )
+        else:
+            execute_prepared(cur, "SELECT * FROM lessons ORDER BY unit_id, \"order\"")
+        return cur.fetchall()
 
-def create_lesson(title: str, unit_id: int, order: int) -> int:
+def create_lesson(title: str, unit_id: int, order: int, session: Optional[RealDictCursor] = None) -> int:
     """Create a new lesson"""
-    conn = get_db_connection()
-    cur = conn.cursor()
-    cur.execute(
-        "INSERT INTO lessons (title, unit_id, \"order\") VALUES (%s, %s, %s) RETURNING id",
-        (title, unit_id, order)
-    )
-    lesson_id = cur.fetchone()['id']
-    conn.commit()
-    cur.close()
-    conn.close()
+    with db_cursor(session) as cur:
+        execute_prepared(cur,
+            "INSERT INTO lessons (title, unit_id, \"order\") VALUES (%s, %s, %s) RETURNING id",
+            (title, unit_id, order)
+        )
+        lesson_id = cur.fetchone()['id']
+    invalidate('lessons', unit_id, session=session)
     return lesson_id
 
-def update_lesson(lesson_id: int, title: str, unit_id: int, order: int):
+def update_lesson(lesson_id: int, title: str, unit_id: int, order: int, session: Optional[RealDictCursor] = None):
     """Update an existing lesson"""
-    conn = get_db_connection()
-    cur = conn.cursor()
-    cur.execute(
-        "UPDATE lessons SET title = %s, unit_id = %s, \"order\" = %s WHERE id = %s",
-        (title, unit_id, order, lesson_id)
-    )
-    conn.commit()
-    cur.close()
-    conn.close()
-
-def delete_lesson(lesson_id: int):
-    """Delete a lesson"""
-    conn = get_db_connection()
-    cur = conn.cursor()
-    cur.execute("DELETE FROM lessons WHERE id = %s", (lesson_id,))
-    conn.commit()
-    cur.close()
-    conn.close()
+    with db_cursor(session) as cur:
+        execute_prepared(cur,
+            """
+            UPDATE lessons l SET title = %s, unit_id = %s, "order" = %s
+            FROM lessons old WHERE l.id = %s AND old.id = l.id
+            RETURNING old.unit_id
+            """,
+            (title, unit_id, order, lesson_id)
+        )
+        old = cur.fetchone()
+    invalidate('lessons', unit_id, old['unit_id'] if old else None, session=session)
+
+def delete_lesson(lesson_id: int, session: Optional[RealDictCursor] = None):
+    """Delete a lesson and everything under it (see delete_subtree)"""
+    delete_subtree('lesson', lesson_id, session)
 
 # ==================== CHALLENGES ====================
 
-def get_challenges(lesson_id: Optional[int] = None) -> List[Dict]:
+@cached(lambda a: [('challenges', a['lesson_id'] or None)])
+def get_challenges(lesson_id: Optional[int] = None, session: Optional[RealDictCursor] = None) -> List[Dict]:
     """Get all challenges or challenges for a specific lesson"""
-    conn = get_db_connection()
-    cur = conn.cursor()
-    if lesson_id:
-        cur.execute(
-            "SELECT * FROM challenges WHERE lesson_id = %s ORDER BY \"order\"",
-            (lesson_id,)
-        )
-    else:
-        cur.execute("SELECT * FROM challenges ORDER BY lesson_id, \"order\"")
-    challenges = cur.fetchall()
-    cur.close()
-    conn.close()
-    return challenges
+    with db_cursor(session) as cur:
+        if lesson_id:
+            execute_prepared(cur,
+                "SELECT * FROM challenges WHERE lesson_id = %s ORDER BY \"order\"",
+                (lesson_id,)
+            )
+        else:
+            execute_prepared(cur, "SELECT * FROM challenges ORDER BY lesson_id, \"order\"")
+        return cur.fetchall()
 
-def create_challenge(lesson_id: int, type: str, question: str, order: int, audio_src: Optional[str] = None) -> int:
+def create_challenge(lesson_id: int, type: str, question: str, order: int, audio_src: Optional[str] = None, session: Optional[RealDictCursor] = None) -> int:
     """Create a new challenge"""
-    conn = get_db_connection()
-    cur = conn.cursor()
-    cur.execute(
-        "INSERT INTO challenges (lesson_id, type, question, \"order\", audio_src) VALUES (%s, %s, %s, %s, %s) RETURNING id",
-        (lesson_id, type, question, order, audio_src)
-    )
-    challenge_id = cur.fetchone()['id']
-    conn.commit()
-    cur.close()
-    conn.close()
+    with db_cursor(session) as cur:
+        execute_prepared(cur,
+            "INSERT INTO challenges (lesson_id, type, question, \"order\", audio_src) VALUES (%s, %s, %s, %s, %s) RETURNING id",
+            (lesson_id, type, question, order, audio_src)
+        )
+        challenge_id = cur.fetchone()['id']
+    invalidate('challenges', lesson_id, session=session)
     return challenge_id
 
-def update_challenge(challenge_id: int, lesson_id: int, type: str, question: str, order: int, audio_src: Optional[str] = None):
+def update_challenge(challenge_id: int, lesson_id: int, type: str, question: str, order: int, audio_src: Optional[str] = None, session: Optional[RealDictCursor] = None):
     """Update an existing challenge"""
-    conn = get_db_connection()
-    cur = conn.cursor()
-    cur.execute(
-        "UPDATE challenges SET lesson_id = %s, type = %s, question = %s, \"order\" = %s, audio_src = %s WHERE id = %s",
-        (lesson_id, type, question, order, audio_src, challenge_id)
-    )
-    conn.commit()
-    cur.close()
-    conn.close()
+    with db_cursor(session) as cur:
+        execute_prepared(cur,
+            """
+            UPDATE challenges c SET lesson_id = %s, type = %s, question = %s, "order" = %s, audio_src = %s
+            FROM challenges old WHERE c.id = %s AND old.id = c.id
+            RETURNING old.lesson_id
+            """,
+            (lesson_id, type, question, order, audio_src, challenge_id)
+        )
+        old = cur.fetchone()
+    invalidate('challenges', lesson_id, old['lesson_id'] if old else None, session=session)
 
-def delete_challenge(challenge_id: int):
+def delete_challenge(challenge_id: int, session: Optional[RealDictCursor] = None):
     """Delete a challenge"""
-    conn = get_db_connection()
-    cur = conn.cursor()
-    cur.execute("DELETE FROM challenges WHERE id = %s", (challenge_id,))
-    conn.commit()
-    cur.close()
-    conn.close()
+    with db_cursor(session) as cur:
+        execute_prepared(cur, "DELETE FROM challenges WHERE id = %s RETURNING lesson_id", (challenge_id,))
+        old = cur.fetchone()
+    invalidate('challenges', old['lesson_id'] if old else None, session=session)
+    invalidate('challenge_options', challenge_id, session=session)
 
 # ==================== CHALLENGE OPTIONS ====================
 
-def get_challenge_options(challenge_id: Optional[int] = None) -> List[Dict]:
+@cached(lambda a: [('challenge_options', a['challenge_id'] or None)])
+def get_challenge_options(challenge_id: Optional[int] = None, session: Optional[RealDictCursor] = None) -> List[Dict]:
     """Get all challenge options or options for a specific challenge"""
-    conn = get_db_connection()
-    cur = conn.cursor()
-    if challenge_id:
-        cur.execute(
-            "SELECT * FROM challenge_options WHERE challenge_id = %s ORDER BY id",
-            (challenge_id,)
+    with db_cursor(session) as cur:
+        if challenge_id:
+            execute_prepared(cur,
+                "SELECT * FROM challenge_options WHERE challenge_id = %s ORDER BY id",
+                (challenge_id,)
+            )
+        else:
+            execute_prepared(cur, "SELECT * FROM challenge_options ORDER BY challenge_id, id")
+        return cur.fetchall()
+
+def _group_options(options: List[Dict], challenge_ids: List[int]) -> Dict[int, List[Dict]]:
+    """Group option rows by challenge id, keeping an entry for every id"""
+    grouped: Dict[int, List[Dict]] = {challenge_id: [] for challenge_id in challenge_ids}
+    for option in options:
+        grouped.setdefault(option['challenge_id'], []).append(option)
+    return grouped
+
+@cached(lambda a: [('challenge_options', challenge_id) for challenge_id in a['challenge_ids']])
+def get_challenge_options_batch(challenge_ids: List[int], session: Optional[RealDictCursor] = None) -> Dict[int, List[Dict]]:
+    """Get the options of several challenges in one query, grouped by challenge id"""
+    if not challenge_ids:
+        return {}
+    with db_cursor(session) as cur:
+        execute_prepared(cur,
+            "SELECT * FROM challenge_options WHERE challenge_id = ANY(%s) ORDER BY challenge_id, id",
+            (list(challenge_ids),)
         )
-    else:
-        cur.execute("SELECT * FROM challenge_options ORDER BY challenge_id, id")
-    options = cur.fetchall()
-    cur.close()
-    conn.close()
-    return options
+        return _group_options(cur.fetchall(), challenge_ids)
 
-def create_challenge_option(challenge_id: int, text: str, correct: bool, image_src: Optional[str] = None, audio_src: Optional[str] = None) -> int:
+@cached(lambda a: [('challenges', a['lesson_id'])] + _whole('challenge_options'))
+def get_lesson_challenge_options(lesson_id: int, session: Optional[RealDictCursor] = None) -> Dict[int, List[Dict]]:
+    """Get the options of every challenge in a lesson in one query, grouped by challenge id"""
+    with db_cursor(session) as cur:
+        execute_prepared(cur,
+            """
+            SELECT co.*
+            FROM challenge_options co
+            JOIN challenges c ON co.challenge_id = c.id
+            WHERE c.lesson_id = %s
+            ORDER BY co.challenge_id, co.id
+            """,
+            (lesson_id,)
+        )
+        return _group_options(cur.fetchall(), [])
+
+def create_challenge_option(challenge_id: int, text: str, correct: bool, image_src: Optional[str] = None, audio_src: Optional[str] = None, session: Optional[RealDictCursor] = None) -> int:
     """Create a new challenge option"""
-    conn = get_db_connection()
-    cur = conn.cursor()
-    cur.execute(
-        "INSERT INTO challenge_options (challenge_id, text, correct, image_src, audio_src) VALUES (%s, %s, %s, %s, %s) RETURNING id",
-        (challenge_id, text, correct, image_src, audio_src)
-    )
-    option_id = cur.fetchone()['id']
-    conn.commit()
-    cur.close()
-    conn.close()
+    with db_cursor(session) as cur:
+        execute_prepared(cur,
+            "INSERT INTO challenge_options (challenge_id, text, correct, image_src, audio_src) VALUES (%s, %s, %s, %s, %s) RETURNING id",
+            (challenge_id, text, correct, image_src, audio_src)
+        )
+        option_id = cur.fetchone()['id']
+    invalidate('challenge_options', challenge_id, session=session)
     return option_id
 
-def update_challenge_option(option_id: int, challenge_id: int, text: str, correct: bool, image_src: Optional[str] = None, audio_src: Optional[str] = None):
+def update_challenge_option(option_id: int, challenge_id: int, text: str, correct: bool, image_src: Optional[str] = None, audio_src: Optional[str] = None, session: Optional[RealDictCursor] = None):
     """Update an existing challenge option"""
-    conn = get_db_connection()
-    cur = conn.cursor()
-    cur.execute(
-        "UPDATE challenge_options SET challenge_id = %s, text = %s, correct = %s, image_src = %s, audio_src = %s WHERE id = %s",
-        (challenge_id, text, correct, image_src, audio_src, option_id)
-    )
-    conn.commit()
-    cur.close()
-    conn.close()
+    with db_cursor(session) as cur:
+        execute_prepared(cur,
+            """
+            UPDATE challenge_options co SET challenge_id = %s, text = %s, correct = %s, image_src = %s, audio_src = %s
+            FROM challenge_options old WHERE co.id = %s AND old.id = co.id
+            RETURNING old.challenge_id
+            """,
+            (challenge_id, text, correct, image_src, audio_src, option_id)
+        )
+        old = cur.fetchone()
+    invalidate('challenge_options', challenge_id, old['challenge_id'] if old else None, session=session)
 
-def delete_challenge_option(option_id: int):
+def delete_challenge_option(option_id: int, session: Optional[RealDictCursor] = None):
     """Delete a challenge option"""
-    conn = get_db_connection()
-    cur = conn.cursor()
-    cur.execute("DELETE FROM challenge_options WHERE id = %s", (option_id,))
-    conn.commit()
-    cur.close()
-    conn.close()
+    with db_cursor(session) as cur:
+        execute_prepared(cur, "DELETE FROM challenge_options WHERE id = %s RETURNING challenge_id", (option_id,))
+        old = cur.fetchone()
+    invalidate('challenge_options', old['challenge_id'] if old else None, session=session)
 
 # ==================== EXAMS ====================
 
-def get_exams(course_id: Optional[int] = None) -> List[Dict]:
+@cached(lambda a: [('exams', a['course_id'] or None)])
+def get_exams(course_id: Optional[int] = None, session: Optional[RealDictCursor] = None) -> List[Dict]:
     """Get all exams or exams for a specific course"""
-    conn = get_db_connection()
-    cur = conn.cursor()
-    if course_id:
-        cur.execute(
-            "SELECT * FROM exams WHERE course_id = %s ORDER BY \"order\"",
-            (course_id,)
-        )
-    else:
-        cur.execute("SELECT * FROM exams ORDER BY course_id, \"order\"")
-    exams = cur.fetchall()
-    cur.close()
-    conn.close()
-    return exams
+    with db_cursor(session) as cur:
+        if course_id:
+            execute_prepared(cur,
+                "SELECT * FROM exams WHERE course_id = %s ORDER BY \"order\"",
+                (course_id,)
+            )
+        else:
+            execute_prepared(cur, "SELECT * FROM exams ORDER BY course_id, \"order\"")
+        return cur.fetchall()
 
-def create_exam(title: str, description: str, course_id: int, order: int) -> int:
+def create_exam(title: str, description: str, course_id: int, order: int, session: Optional[RealDictCursor] = None) -> int:
     """Create a new exam"""
-    conn = get_db_connection()
-    cur = conn.cursor()
-    cur.execute(
-        "INSERT INTO exams (title, description, course_id, \"order\") VALUES (%s, %s, %s, %s) RETURNING id",
-        (title, description, course_id, order)
-    )
-    exam_id = cur.fetchone()['id']
-    conn.commit()
-    cur.close()
-    conn.close()
+    with db_cursor(session) as cur:
+        execute_prepared(cur,
+            "INSERT INTO exams (title, description, course_id, \"order\") VALUES (%s, %s, %s, %s) RETURNING id",
+            (title, description, course_id, order)
+        )
+        exam_id = cur.fetchone()['id']
+    invalidate('exams', course_id, session=session)
     return exam_id
 
-def update_exam(exam_id: int, title: str, description: str, course_id: int, order: int):
+def update_exam(exam_id: int, title: str, description: str, course_id: int, order: int, session: Optional[RealDictCursor] = None):
     """Update an existing exam"""
-    conn = get_db_connection()
-    cur = conn.cursor()
-    cur.execute(
-        "UPDATE exams SET title = %s, description = %s, course_id = %s, \"order\" = %s WHERE id = %s",
-        (title, description, course_id, order, exam_id)
-    )
-    conn.commit()
-    cur.close()
-    conn.close()
+    with db_cursor(session) as cur:
+        execute_prepared(cur,
+            """
+            UPDATE exams e SET title = %s, description = %s, course_id = %s, "order" = %s
+            FROM exams old WHERE e.id = %s AND old.id = e.id
+            RETURNING old.course_id
+            """,
+            (title, description, course_id, order, exam_id)
+        )
+        old = cur.fetchone()
+    invalidate('exams', course_id, old['course_id'] if old else None, session=session)
 
-def delete_exam(exam_id: int):
+def delete_exam(exam_id: int, session: Optional[RealDictCursor] = None):
     """Delete an exam"""
-    conn = get_db_connection()
-    cur = conn.cursor()
-    cur.execute("DELETE FROM exams WHERE id = %s", (exam_id,))
-    conn.commit()
-    cur.close()
-    conn.close()
+    with db_cursor(session) as cur:
+        execute_prepared(cur, "DELETE FROM exams WHERE id = %s RETURNING course_id", (exam_id,))
+        old = cur.fetchone()
+    invalidate('exams', old['course_id'] if old else None, session=session)
+    invalidate('exam_lessons', exam_id, session=session)
 
 # ==================== EXAM LESSONS ====================
 
-def get_exam_lessons(exam_id: int) -> List[Dict]:
+@cached(lambda a: [('exam_lessons', a['exam_id'])] + _whole('lessons'))
+def get_exam_lessons(exam_id: int, session: Optional[RealDictCursor] = None) -> List[Dict]:
     """Get all lessons assigned to an exam"""
-    conn = get_db_connection()
-    cur = conn.cursor()
-    cur.execute(
-        """
-        SELECT el.*, l.title as lesson_title
-        FROM exam_lessons el
-        JOIN lessons l ON el.lesson_id = l.id
-        WHERE el.exam_id = %s
-        ORDER BY el.\"order\"
-        """,
-        (exam_id,)
-    )
-    exam_lessons = cur.fetchall()
-    cur.close()
-    conn.close()
-    return exam_lessons
+    with db_cursor(session) as cur:
+        execute_prepared(cur,
+            """
+            SELECT el.*, l.title as lesson_title
+            FROM exam_lessons el
+            JOIN lessons l ON el.lesson_id = l.id
+            WHERE el.exam_id = %s
+            ORDER BY el.\"order\"
+            """,
+            (exam_id,)
+        )
+        return cur.fetchall()
+
+@cached(lambda a: [('exam_lessons', exam_id) for exam_id in a['exam_ids']])
+def get_exam_lesson_counts(exam_ids: List[int], session: Optional[RealDictCursor] = None) -> Dict[int, int]:
+    """Number of lessons assigned to each exam, in one grouped query"""
+    if not exam_ids:
+        return {}
+    with db_cursor(session) as cur:
+        execute_prepared(cur,
+            "SELECT exam_id, count(*) AS lessons FROM exam_lessons WHERE exam_id = ANY(%s) GROUP BY exam_id",
+            (list(exam_ids),)
+        )
+        counts = {row['exam_id']: row['lessons'] for row in cur.fetchall()}
+    return {exam_id: counts.get(exam_id, 0) for exam_id in exam_ids}
 
-def add_lesson_to_exam(exam_id: int, lesson_id: int, order: int) -> int:
+def add_lesson_to_exam(exam_id: int, lesson_id: int, order: int, session: Optional[RealDictCursor] = None) -> int:
     """Add a lesson to an exam"""
-    conn = get_db_connection()
-    cur = conn.cursor()
-    cur.execute(
-        "INSERT INTO exam_lessons (exam_id, lesson_id, \"order\") VALUES (%s, %s, %s) RETURNING id",
-        (exam_id, lesson_id, order)
-    )
-    exam_lesson_id = cur.fetchone()['id']
-    conn.commit()
-    cur.close()
-    conn.close()
+    with db_cursor(session) as cur:
+        execute_prepared(cur,
+            "INSERT INTO exam_lessons (exam_id, lesson_id, \"order\") VALUES (%s, %s, %s) RETURNING id",
+            (exam_id, lesson_id, order)
+        )
+        exam_lesson_id = cur.fetchone()['id']
+    invalidate('exam_lessons', exam_id, session=session)
     return exam_lesson_id
 
-def remove_lesson_from_exam(exam_lesson_id: int):
+def remove_lesson_from_exam(exam_lesson_id: int, session: Optional[RealDictCursor] = None):
     """Remove a lesson from an exam"""
-    conn = get_db_connection()
-    cur = conn.cursor()
-    cur.execute("DELETE FROM exam_lessons WHERE id = %s", (exam_lesson_id,))
-    conn.commit()
-    cur.close()
-    conn.close()
+    with db_cursor(session) as cur:
+        execute_prepared(cur, "DELETE FROM exam_lessons WHERE id = %s RETURNING exam_id", (exam_lesson_id,))
+        old = cur.fetchone()
+    invalidate('exam_lessons', old['exam_id'] if old else None, session=session)
+
+# ==================== REORDER ====================
+
+# Spacing between consecutive order keys written by the reorder functions,
+# so a later insert can usually take a free key in between (see order_between)
+ORDER_GAP = 100
+
+def order_between(before: Optional[int], after: Optional[int]) -> Optional[int]:
+    """Free order key between two neighbours (None for the start/end of the
+    list), or None if there is no gap left and the list needs a reorder"""
+    if before is None and after is None:
+        return ORDER_GAP
+    if after is None:
+        return before + ORDER_GAP
+    if before is None:
+        before = 0
+    if after - before < 2:
+        return None
+    return (before + after) // 2
+
+def _reorder(table: str, parent_column: str, parent_id: int, ordered_ids: List[int], session: Optional[RealDictCursor] = None) -> int:
+    """Rewrite the order keys of every child of a parent in one UPDATE.
+
+    `ordered_ids` must list each child exactly once, in the new order; child
+    i gets order (i + 1) * ORDER_GAP. Only rows whose key changes are
+    written. Returns the number of rows updated.
+    """
+    with db_cursor(session) as cur:
+        execute_prepared(cur, f"SELECT array_agg(id) AS ids FROM {table} WHERE {parent_column} = %s", (parent_id,))
+        current = cur.fetchone()['ids'] or []
+        if len(ordered_ids) != len(set(ordered_ids)) or set(ordered_ids) != set(current):
+            raise Exception(f"New order for {table} must list each of the {len(current)} rows exactly once")
+        execute_prepared(cur,
+            f"""
+            UPDATE {table} t SET "order" = v.position * %s
+            FROM unnest(%s::integer[]) WITH ORDINALITY AS v(id, position)
+            WHERE t.id = v.id AND t.{parent_column} = %s AND t."order" IS DISTINCT FROM v.position * %s
+            """,
+            (ORDER_GAP, list(ordered_ids), parent_id, ORDER_GAP)
+        )
+        updated = cur.rowcount
+    invalidate(table, parent_id, session=session)
+    return updated
+
+def reorder_lessons(unit_id: int, lesson_ids: List[int], session: Optional[RealDictCursor] = None) -> int:
+    """Set the order of all lessons of a unit; returns the rows updated"""
+    return _reorder('lessons', 'unit_id', unit_id, lesson_ids, session)
+
+def reorder_challenges(lesson_id: int, challenge_ids: List[int], session: Optional[RealDictCursor] = None) -> int:
+    """Set the order of all challenges of a lesson; returns the rows updated"""
+    return _reorder('challenges', 'lesson_id', lesson_id, challenge_ids, session)
+
+def reorder_exam_lessons(exam_id: int, exam_lesson_ids: List[int], session: Optional[RealDictCursor] = None) -> int:
+    """Set the order of all lessons of an exam (exam_lessons ids); returns the rows updated"""
+    return _reorder('exam_lessons', 'exam_id', exam_id, exam_lesson_ids, session)
+
+# ==================== CASCADE DELETE ====================
+# Deleting a course, unit or lesson removes its whole subtree. The ids of
+# the affected units, lessons, challenges and exams are collected once, and
+# every table is then cleared with one set-based DELETE.
+
+_SUBTREE_ROOTS = {
+    'course': {
+        'units': "SELECT id FROM units WHERE course_id = %(id)s",
+        'lessons': "SELECT id FROM lessons WHERE unit_id IN (SELECT id FROM {units})",
+        'exams': "SELECT id FROM exams WHERE course_id = %(id)s",
+    },
+    'unit': {
+        'units': "SELECT id FROM units WHERE id = %(id)s",
+        'lessons': "SELECT id FROM lessons WHERE unit_id IN (SELECT id FROM {units})",
+        'exams': "SELECT id FROM exams WHERE false",
+    },
+    'lesson': {
+        'units': "SELECT id FROM units WHERE false",
+        'lessons': "SELECT id FROM lessons WHERE id = %(id)s",
+        'exams': "SELECT id FROM exams WHERE false",
+    },
+}
+
+def _subtree_params(kind: str, node_id: int) -> Dict[str, Any]:
+    if kind not in _SUBTREE_ROOTS:
+        raise Exception(f"Cannot delete subtree of kind: {kind}")
+    return {'id': node_id, 'course_id': node_id if kind == 'course' else None}
+
+def get_delete_impact(kind: str, node_id: int, session: Optional[RealDictCursor] = None) -> Dict[str, int]:
+    """Count everything deleting a 'course', 'unit' or 'lesson' would remove,
+    with one aggregate query: units, lessons, challenges, options, exams,
+    exam_lessons, progress (challenge progress rows), exam_results and
+    active_users (user progress rows pointing at the course)"""
+    params = _subtree_params(kind, node_id)
+    roots = _SUBTREE_ROOTS[kind]
+    with db_cursor(session) as cur:
+        cur.execute(
+            f"""
+            WITH u AS ({roots['units']}),
+            l AS ({roots['lessons'].format(units='u')}),
+            c AS (SELECT id FROM challenges WHERE lesson_id IN (SELECT id FROM l)),
+            e AS ({roots['exams']})
+            SELECT
+                (SELECT count(*) FROM u) AS units,
+                (SELECT count(*) FROM l) AS lessons,
+                (SELECT count(*) FROM c) AS challenges,
+                (SELECT count(*) FROM challenge_options WHERE challenge_id IN (SELECT id FROM c)) AS options,
+                (SELECT count(*) FROM e) AS exams,
+                (SELECT count(*) FROM exam_lessons WHERE lesson_id IN (SELECT id FROM l) OR exam_id IN (SELECT id FROM e)) AS exam_lessons,
+                (SELECT count(*) FROM challenge_progress WHERE challenge_id IN (SELECT id FROM c)) AS progress,
+                (SELECT count(*) FROM exam_results WHERE exam_id IN (SELECT id FROM e)) AS exam_results,
+                (SELECT count(*) FROM user_progress WHERE active_course_id = %(course_id)s) AS active_users
+            """,
+            params
+        )
+        return dict(cur.fetchone())
+
+def delete_subtree(kind: str, node_id: int, session: Optional[RealDictCursor] = None) -> Dict[str, int]:
+    """Delete a 'course', 'unit' or 'lesson' and its whole subtree in one
+    transaction (or inside `session`), children first, one DELETE per table.
+
+    Returns the number of rows deleted per table.
+    """
+    if session is None:
+        with transaction() as session:
+            return delete_subtree(kind, node_id, session)
+
+    params = _subtree_params(kind, node_id)
+    roots = _SUBTREE_ROOTS[kind]
+    session.execute("DROP TABLE IF EXISTS delete_units, delete_lessons, delete_challenges, delete_exams")
+    session.execute(f"CREATE TEMP TABLE delete_units ON COMMIT DROP AS {roots['units']}", params)
+    session.execute(f"CREATE TEMP TABLE delete_lessons ON COMMIT DROP AS {roots['lessons'].format(units='delete_units')}", params)
+    session.execute(
+        "CREATE TEMP TABLE delete_challenges ON COMMIT DROP AS "
+        "SELECT id FROM challenges WHERE lesson_id IN (SELECT id FROM delete_lessons)"
+    )
+    session.execute(f"CREATE TEMP TABLE delete_exams ON COMMIT DROP AS {roots['exams']}", params)
+
+    statements = [
+        ('challenge_progress', "DELETE FROM challenge_progress WHERE challenge_id IN (SELECT id FROM delete_challenges)"),
+        ('challenge_options', "DELETE FROM challenge_options WHERE challenge_id IN (SELECT id FROM delete_challenges)"),
+        ('exam_lessons', "DELETE FROM exam_lessons WHERE lesson_id IN (SELECT id FROM delete_lessons) OR exam_id IN (SELECT id FROM delete_exams)"),
+        ('exam_results', "DELETE FROM exam_results WHERE exam_id IN (SELECT id FROM delete_exams)"),
+        ('challenges', "DELETE FROM challenges WHERE id IN (SELECT id FROM delete_challenges)"),
+        ('lessons', "DELETE FROM lessons WHERE id IN (SELECT id FROM delete_lessons)"),
+        ('exams', "DELETE FROM exams WHERE id IN (SELECT id FROM delete_exams)"),
+        ('units', "DELETE FROM units WHERE id IN (SELECT id FROM delete_units)"),
+    ]
+    if kind == 'course':
+        statements += [
+            ('user_progress', "DELETE FROM user_progress WHERE active_course_id = %(id)s"),
+            ('courses', "DELETE FROM courses WHERE id = %(id)s"),
+        ]
+    deleted = {}
+    for table, sql in statements:
+        session.execute(sql, params)
+        deleted[table] = session.rowcount
+
+    for table in CONTENT_TABLES:
+        invalidate(table, session=session)
+    return deleted
+
+# ==================== LISTINGS ====================
+# Id/label projections for selectboxes: only the columns a widget shows
+
+# Longest challenge label returned by list_challenges
+LABEL_LENGTH = 50
+
+@cached(lambda a: _whole('courses'))
+def list_courses(session: Optional[RealDictCursor] = None) -> List[Dict]:
+    """Get id and title of all courses"""
+    with db_cursor(session) as cur:
+        execute_prepared(cur, "SELECT id, title FROM courses ORDER BY id")
+        return cur.fetchall()
+
+@cached(lambda a: [('units', a['course_id'] or None)])
+def list_units(course_id: Optional[int] = None, session: Optional[RealDictCursor] = None) -> List[Dict]:
+    """Get id and title of all units or units for a specific course"""
+    with db_cursor(session) as cur:
+        if course_id:
+            execute_prepared(cur,
+                "SELECT id, title FROM units WHERE course_id = %s ORDER BY \"order\"",
+                (course_id,)
+            )
+        else:
+            execute_prepared(cur, "SELECT id, title FROM units ORDER BY course_id, \"order\"")
+        return cur.fetchall()
+
+@cached(lambda a: [('lessons', a['unit_id'] or None)] + (_whole('units') if a['course_id'] else []))
+def list_lessons(unit_id: Optional[int] = None, course_id: Optional[int] = None, session: Optional[RealDictCursor] = None) -> List[Dict]:
+    """Get id and title of lessons, optionally for a specific unit or course"""
+    with db_cursor(session) as cur:
+        if unit_id:
+            execute_prepared(cur,
+                "SELECT id, title FROM lessons WHERE unit_id = %s ORDER BY \"order\"",
+                (unit_id,)
+            )
+        elif course_id:
+            execute_prepared(cur,
+                """
+                SELECT l.id, l.title
+                FROM lessons l
+                JOIN units u ON l.unit_id = u.id
+                WHERE u.course_id = %s
+                ORDER BY u."order", l."order"
+                """,
+                (course_id,)
+            )
+        else:
+            execute_prepared(cur, "SELECT id, title FROM lessons ORDER BY unit_id, \"order\"")
+        return cur.fetchall()
+
+@cached(lambda a: [('challenges', a['lesson_id'] or None)])
+def list_challenges(lesson_id: Optional[int] = None, label_length: int = LABEL_LENGTH, session: Optional[RealDictCursor] = None) -> List[Dict]:
+    """Get id and a truncated question (`label`) of challenges, optionally for a specific lesson"""
+    label = (
+        "CASE WHEN length(question) > %(n)s THEN left(question, %(n)s) || '...' "
+        "ELSE question END AS label"
+    )
+    with db_cursor(session) as cur:
+        if lesson_id:
+            cur.execute(
+                f"SELECT id, {label} FROM challenges WHERE lesson_id = %(lesson_id)s ORDER BY \"order\"",
+                {'n': label_length, 'lesson_id': lesson_id}
+            )
+        else:
+            cur.execute(
+                f"SELECT id, {label} FROM challenges ORDER BY lesson_id, \"order\"",
+                {'n': label_length}
+            )
+        return cur.fetchall()
+
+# ==================== PAGINATION ====================
+# Keyset pagination: each page returns `next_cursor`, the sort key of its
+# last row, to be passed back as `after`. Cost stays constant per page no
+# matter how deep the listing goes.
+
+@cached(lambda a: [('challenges', a['lesson_id'] or None)])
+def get_challenges_page(lesson_id: Optional[int] = None, after: Optional[Tuple[int, int, int]] = None, limit: int = PAGE_SIZE, label_length: Optional[int] = None, session: Optional[RealDictCursor] = None) -> Dict[str, Any]:
+    """Get one page of challenges ordered by (lesson_id, "order", id).
+
+    With `label_length` only id, lesson_id, order and a truncated question
+    (`label`) are returned. `after` is the `next_cursor` of the previous
+    page; `next_cursor` is None on the last page.
+    """
+    if label_length is None:
+        columns = "*"
+    else:
+        columns = (
+            "id, lesson_id, \"order\", CASE WHEN length(question) > %(n)s "
+            "THEN left(question, %(n)s) || '...' ELSE question END AS label"
+        )
+    conditions = []
+    params: Dict[str, Any] = {'n': label_length, 'limit': limit + 1}
+    if lesson_id:
+        conditions.append("lesson_id = %(lesson_id)s")
+        params['lesson_id'] = lesson_id
+    if after:
+        conditions.append("(lesson_id, \"order\", id) > (%(after_lesson)s, %(after_order)s, %(after_id)s)")
+        params['after_lesson'], params['after_order'], params['after_id'] = after
+    where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+    with db_cursor(session) as cur:
+        cur.execute(
+            f"SELECT {columns} FROM challenges {where} ORDER BY lesson_id, \"order\", id LIMIT %(limit)s",
+            params
+        )
+        rows = cur.fetchall()
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = (rows[-1]['lesson_id'], rows[-1]['order'], rows[-1]['id'])
+    return {'items': rows, 'next_cursor': next_cursor}
+
+@cached(lambda a: [('challenge_options', a['challenge_id'] or None)] + _whole('challenges'))
+def get_challenge_options_page(challenge_id: Optional[int] = None, lesson_id: Optional[int] = None, after: Optional[Tuple[int, int, int, int]] = None, limit: int = PAGE_SIZE, session: Optional[RealDictCursor] = None) -> Dict[str, Any]:
+    """Get one page of challenge options ordered by their challenge's
+    (lesson_id, "order") and then by option id.
+
+    `after` is the `next_cursor` of the previous page; `next_cursor` is None
+    on the last page.
+    """
+    conditions = []
+    params: Dict[str, Any] = {'limit': limit + 1}
+    if challenge_id:
+        conditions.append("co.challenge_id = %(challenge_id)s")
+        params['challenge_id'] = challenge_id
+    if lesson_id:
+        conditions.append("c.lesson_id = %(lesson_id)s")
+        params['lesson_id'] = lesson_id
+    if after:
+        conditions.append(
+            "(c.lesson_id, c.\"order\", co.challenge_id, co.id) > "
+            "(%(after_lesson)s, %(after_order)s, %(after_challenge)s, %(after_id)s)"
+        )
+        params['after_lesson'], params['after_order'], params['after_challenge'], params['after_id'] = after
+    where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+    with db_cursor(session) as cur:
+        cur.execute(
+            f"""
+            SELECT co.*, c.lesson_id, c."order" AS challenge_order
+            FROM challenge_options co
+            JOIN challenges c ON co.challenge_id = c.id
+            {where}
+            ORDER BY c.lesson_id, c."order", co.challenge_id, co.id
+            LIMIT %(limit)s
+            """,
+            params
+        )
+        rows = cur.fetchall()
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        next_cursor = (last['lesson_id'], last['challenge_order'], last['challenge_id'], last['id'])
+    return {'items': rows, 'next_cursor': next_cursor}
+
+# ==================== SEARCH ====================
+
+# Text search configuration; must match migration-add-search-indexes.sql
+SEARCH_CONFIG = 'spanish'
+# Matches counted exactly; beyond this the total is reported as "more than"
+SEARCH_COUNT_LIMIT = 1000
+
+@cached(lambda a: _whole('challenges', 'challenge_options'))
+def search_content(query: str, limit: int = PAGE_SIZE, offset: int = 0, session: Optional[RealDictCursor] = None) -> Dict[str, Any]:
+    """Full-text search over challenge questions and option texts.
+
+    `query` accepts web-search syntax ("frases entre comillas", OR, -excluir).
+    Filters and ranks on the stored `search_vector` columns (see
+    migration-add-search-indexes.sql). Returns `items` ranked by relevance
+    (kind, id, challenge_id, lesson_id, text, snippet, rank), the `total`
+    number of matches counted up to SEARCH_COUNT_LIMIT and `total_capped`
+    when there are more.
+    """
+    if not query or not query.strip():
+        return {'items': [], 'total': 0, 'total_capped': False}
+    with db_cursor(session) as cur:
+        cur.execute(
+            f"""
+            WITH q AS (
+                SELECT websearch_to_tsquery('{SEARCH_CONFIG}', %(query)s) AS query
+            ),
+            hits AS (
+                SELECT 'challenge' AS kind, c.id, c.id AS challenge_id, c.lesson_id, c.question AS text,
+                       ts_rank(c.search_vector, q.query) AS rank
+                FROM challenges c, q
+                WHERE c.search_vector @@ q.query
+                UNION ALL
+                SELECT 'option' AS kind, co.id, co.challenge_id, c.lesson_id, co.text,
+                       ts_rank(co.search_vector, q.query) AS rank
+                FROM challenge_options co
+                JOIN challenges c ON co.challenge_id = c.id, q
+                WHERE co.search_vector @@ q.query
+            ),
+            page AS (
+                SELECT * FROM hits
+                ORDER BY rank DESC, kind, id
+                LIMIT %(limit)s OFFSET %(offset)s
+            )
+            SELECT page.*,
+                   ts_headline('{SEARCH_CONFIG}', page.text, q.query,
+                               'StartSel=**, StopSel=**, MaxWords=35, MinWords=15') AS snippet,
+                   (SELECT count(*) FROM (SELECT 1 FROM hits LIMIT %(count_limit)s + 1) capped) AS total
+            FROM page, q
+            ORDER BY page.rank DESC, page.kind, page.id
+            """,
+            {'query': query, 'limit': limit, 'offset': offset, 'count_limit': SEARCH_COUNT_LIMIT}
+        )
+        rows = cur.fetchall()
+    total = rows[0]['total'] if rows else 0
+    return {
+        'items': [{k: v for k, v in row.items() if k != 'total'} for row in rows],
+        'total': min(total, SEARCH_COUNT_LIMIT),
+        'total_capped': total > SEARCH_COUNT_LIMIT,
+    }
+
+# ==================== DUPLICATES ====================
+
+# Trigram similarity (0-1) from which two questions count as likely duplicates
+DUPLICATE_THRESHOLD = 0.6
+
+@contextmanager
+def _similarity_session(threshold: float, session: Optional[RealDictCursor] = None):
+    """Yield a session whose pg_trgm threshold (used by the `%` operator) is `threshold`.
+
+    The setting is transaction-local, so it never leaks into pooled connections.
+    """
+    if session is None:
+        with transaction() as session:
+            session.execute("SELECT set_config('pg_trgm.similarity_threshold', %s, true)", (str(threshold),))
+            yield session
+    else:
+        session.execute("SELECT set_config('pg_trgm.similarity_threshold', %s, true)", (str(threshold),))
+        yield session
+
+@cached(lambda a: _whole('challenges'))
+def find_similar_challenges(questions: List[str], threshold: float = DUPLICATE_THRESHOLD, matches_per_question: int = 3, session: Optional[RealDictCursor] = None) -> List[Dict]:
+    """Find stored challenges whose question is similar to each incoming question.
+
+    All questions are checked in one query using the trigram index. Returns
+    rows with `input_index` (position in `questions`), `input_question`,
+    the matching challenge `id`, `question`, `lesson_id` and `similarity`.
+    """
+    if not questions:
+        return []
+    with _similarity_session(threshold, session) as cur:
+        cur.execute(
+            """
+            SELECT i.ord - 1 AS input_index, i.q AS input_question,
+                   m.id, m.question, m.lesson_id, m.similarity
+            FROM unnest(%s::text[]) WITH ORDINALITY AS i(q, ord)
+            JOIN LATERAL (
+                SELECT c.id, c.question, c.lesson_id, similarity(c.question, i.q) AS similarity
+                FROM challenges c
+                WHERE c.question %% i.q
+                ORDER BY similarity(c.question, i.q) DESC, c.id
+                LIMIT %s
+            ) m ON true
+            ORDER BY i.ord, m.similarity DESC
+            """,
+            (list(questions), matches_per_question)
+        )
+        return cur.fetchall()
+
+@cached(lambda a: _whole('challenges'))
+def find_duplicate_challenges(threshold: float = DUPLICATE_THRESHOLD, session: Optional[RealDictCursor] = None) -> List[Dict]:
+    """Find pairs of stored challenges with near-duplicate questions.
+
+    Each pair is reported once (`id` < `duplicate_id`), most similar first.
+    """
+    with _similarity_session(threshold, session) as cur:
+        cur.execute(
+            """
+            SELECT a.id, a.question, a.lesson_id,
+                   b.id AS duplicate_id, b.question AS duplicate_question, b.lesson_id AS duplicate_lesson_id,
+                   similarity(a.question, b.question) AS similarity
+            FROM challenges a
+            JOIN challenges b ON b.question % a.question AND b.id > a.id
+            ORDER BY similarity DESC, a.id, b.id
+            """
+        )
+        return cur.fetchall()
+
+# ==================== COURSE TREE ====================
+
+class CourseTree:
+    """A course with its units, lessons, challenges, options and exams.
+
+    The nested lists keep the course order (`units[i]['lessons']`,
+    `lesson['challenges']`, `challenge['options']`); the `*_by_id` indexes
+    give direct access to any node, and `parent_of` walks back up.
+    """
+
+    def __init__(self, data: Dict[str, Any]):
+        self.course: Dict[str, Any] = data['course']
+        self.units: List[Dict] = data['units']
+        self.exams: List[Dict] = data['exams']
+        self.units_by_id: Dict[int, Dict] = {}
+        self.lessons_by_id: Dict[int, Dict] = {}
+        self.challenges_by_id: Dict[int, Dict] = {}
+        self.options_by_id: Dict[int, Dict] = {}
+        self.exams_by_id: Dict[int, Dict] = {exam['id']: exam for exam in self.exams}
+        self.exam_lessons_by_id: Dict[int, Dict] = {
+            exam_lesson['id']: exam_lesson for exam in self.exams for exam_lesson in exam['lessons']
+        }
+        for unit in self.units:
+            self.units_by_id[unit['id']] = unit
+            for lesson in unit['lessons']:
+                self.lessons_by_id[lesson['id']] = lesson
+                for challenge in lesson['challenges']:
+                    self.challenges_by_id[challenge['id']] = challenge
+                    for option in challenge['options']:
+                        self.options_by_id[option['id']] = option
+
+    def lessons(self) -> List[Dict]:
+        """All lessons of the course in unit/lesson order"""
+        return [lesson for unit in self.units for lesson in unit['lessons']]
+
+    def challenges(self) -> List[Dict]:
+        """All challenges of the course in unit/lesson/challenge order"""
+        return [challenge for lesson in self.lessons() for challenge in lesson['challenges']]
+
+    def parent_of(self, node: Dict) -> Optional[Dict]:
+        """Parent node of a unit, lesson, challenge, option, exam or exam lesson"""
+        # Exam lessons also carry lesson_id, but belong to their exam
+        if 'exam_id' in node:
+            return self.exams_by_id.get(node['exam_id'])
+        if 'challenge_id' in node:
+            return self.challenges_by_id.get(node['challenge_id'])
+        if 'lesson_id' in node:
+            return self.lessons_by_id.get(node['lesson_id'])
+        if 'unit_id' in node:
+            return self.units_by_id.get(node['unit_id'])
+        if 'course_id' in node:
+            return self.course
+        return None
+
+@cached(lambda a: _whole(*CONTENT_TABLES))
+def get_course_tree(course_id: int, session: Optional[RealDictCursor] = None) -> Optional[CourseTree]:
+    """Load a whole course hierarchy in one round trip using JSON aggregation"""
+    with db_cursor(session) as cur:
+        cur.execute(
+            """
+            SELECT jsonb_build_object(
+                'course', to_jsonb(c),
+                'units', COALESCE((
+                    SELECT jsonb_agg(to_jsonb(u) || jsonb_build_object('lessons', COALESCE((
+                        SELECT jsonb_agg(to_jsonb(l) || jsonb_build_object('challenges', COALESCE((
+                            SELECT jsonb_agg((to_jsonb(ch) - 'search_vector') || jsonb_build_object('options', COALESCE((
+                                SELECT jsonb_agg((to_jsonb(co) - 'search_vector') ORDER BY co.id)
+                                FROM challenge_options co WHERE co.challenge_id = ch.id
+                            ), '[]'::jsonb)) ORDER BY ch."order", ch.id)
+                            FROM challenges ch WHERE ch.lesson_id = l.id
+                        ), '[]'::jsonb)) ORDER BY l."order", l.id)
+                        FROM lessons l WHERE l.unit_id = u.id
+                    ), '[]'::jsonb)) ORDER BY u."order", u.id)
+                    FROM units u WHERE u.course_id = c.id
+                ), '[]'::jsonb),
+                'exams', COALESCE((
+                    SELECT jsonb_agg(to_jsonb(e) || jsonb_build_object('lessons', COALESCE((
+                        SELECT jsonb_agg(to_jsonb(el) ORDER BY el."order", el.id)
+                        FROM exam_lessons el WHERE el.exam_id = e.id
+                    ), '[]'::jsonb)) ORDER BY e."order", e.id)
+                    FROM exams e WHERE e.course_id = c.id
+                ), '[]'::jsonb)
+            ) AS tree
+            FROM courses c
+            WHERE c.id = %s
+            """,
+            (course_id,)
+        )
+        row = cur.fetchone()
+    return CourseTree(row['tree']) if row else None
+
+# ==================== STATISTICS ====================
+
+@cached(lambda a: _whole(*CONTENT_TABLES), ttl=STATS_TTL)
+def get_content_stats(session: Optional[RealDictCursor] = None) -> Dict[str, int]:
+    """Get row counts and media coverage of the content tables in one query.
+
+    The result is cached for at most STATS_TTL seconds.
+    """
+    with db_cursor(session) as cur:
+        cur.execute(
+            """
+            SELECT
+                (SELECT count(*) FROM courses) AS courses,
+                (SELECT count(*) FROM units) AS units,
+                (SELECT count(*) FROM lessons) AS lessons,
+                c.challenges,
+                c.challenges_with_audio,
+                o.options,
+                o.options_with_image,
+                o.options_with_audio,
+                (SELECT count(*) FROM exams) AS exams
+            FROM
+                (SELECT count(*) AS challenges,
+                        count(*) FILTER (WHERE audio_src <> '') AS challenges_with_audio
+                 FROM challenges) c,
+                (SELECT count(*) AS options,
+                        count(*) FILTER (WHERE image_src <> '') AS options_with_image,
+                        count(*) FILTER (WHERE audio_src <> '') AS options_with_audio
+                 FROM challenge_options) o
+            """
+        )
+        return dict(cur.fetchone())
+
+# ==================== BULK INSERTS ====================
+
+def _insert_bulk(table: str, columns: List[str], rows: List[Dict], key_column: Optional[str], session: Optional[RealDictCursor] = None) -> List[int]:
+    """Insert many rows with multi-row INSERT statements.
+
+    Ids are reserved from the table's sequence up front and written
+    explicitly, so the returned list matches the order of `rows`. Without a
+    session the whole batch runs in its own transaction.
+    """
+    if not rows:
+        return []
+    if session is None:
+        with transaction() as session:
+            return _insert_bulk(table, columns, rows, key_column, session)
+    session.execute(
+        "SELECT nextval(pg_get_serial_sequence(%s, 'id')) AS id FROM generate_series(1, %s)",
+        (table, len(rows))
+    )
+    ids = sorted(r['id'] for r in session.fetchall())
+    column_list = ", ".join(f'"{c}"' for c in ["id"] + columns)
+    execute_values(
+        session,
+        f"INSERT INTO {table} ({column_list}) VALUES %s",
+        [(row_id, *(row.get(c) for c in columns)) for row_id, row in zip(ids, rows)],
+        page_size=BULK_PAGE_SIZE
+    )
+    invalidate(table, *({row.get(key_column) for row in rows} if key_column else ()), session=session)
+    return ids
+
+def create_courses_bulk(courses: List[Dict], session: Optional[RealDictCursor] = None) -> List[int]:
+    """Create many courses (keys: title, image_src); returns ids in input order"""
+    return _insert_bulk("courses", ["title", "image_src"], courses, None, session)
+
+def create_units_bulk(units: List[Dict], session: Optional[RealDictCursor] = None) -> List[int]:
+    """Create many units (keys: title, description, course_id, order); returns ids in input order"""
+    return _insert_bulk("units", ["title", "description", "course_id", "order"], units, "course_id", session)
+
+def create_lessons_bulk(lessons: List[Dict], session: Optional[RealDictCursor] = None) -> List[int]:
+    """Create many lessons (keys: title, unit_id, order); returns ids in input order"""
+    return _insert_bulk("lessons", ["title", "unit_id", "order"], lessons, "unit_id", session)
+
+def create_challenges_bulk(challenges: List[Dict], session: Optional[RealDictCursor] = None) -> List[int]:
+    """Create many challenges (keys: lesson_id, type, question, order, audio_src); returns ids in input order"""
+    return _insert_bulk("challenges", ["lesson_id", "type", "question", "order", "audio_src"], challenges, "lesson_id", session)
 
+def create_challenge_options_bulk(options: List[Dict], session: Optional[RealDictCursor] = None) -> List[int]:
+    """Create many challenge options (keys: challenge_id, text, correct, image_src, audio_src); returns ids in input order"""
+    return _insert_bulk("challenge_options", ["challenge_id", "text", "correct", "image_src", "audio_src"], options, "challenge_id", session)
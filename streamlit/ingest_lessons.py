@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Batch lesson ingestion for FIBRA Content Management System
+Parses many lesson text files in parallel (one process per CPU core),
+validates each file on its own and writes the challenges and options of
+all valid files to the database in one transaction with bulk inserts.
+
+Each file is given as <file>:<lesson_id>. An answer key named
+<file>_respuestas.txt next to a lesson file is used automatically.
+
+Usage:
+    python ingest_lessons.py leccion1.txt:13 leccion2.txt:17 [--workers 4] [--strict] [--dry-run]
+"""
+
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Dict, Optional, Any, Set, Tuple
+
+import lesson_parser
+
+def answer_key_for(path: str) -> Optional[str]:
+    """Answer key file that sits next to a lesson file, if any"""
+    key = f"{os.path.splitext(path)[0]}_respuestas.txt"
+    return key if os.path.exists(key) else None
+
+def parse_target(target: str) -> Tuple[str, Optional[int]]:
+    """Split a "<file>:<lesson_id>" argument"""
+    path, sep, lesson_id = target.rpartition(":")
+    if sep and lesson_id.isdigit():
+        return path, int(lesson_id)
+    return target, None
+
+def existing_lessons(lesson_ids: List[int]) -> Set[int]:
+    """The given lesson ids that exist in the database, in one query"""
+    import db_utils
+
+    if not lesson_ids:
+        return set()
+    with db_utils.db_cursor() as cur:
+        cur.execute("SELECT id FROM lessons WHERE id = ANY(%s)", (lesson_ids,))
+        return {r["id"] for r in cur.fetchall()}
+
+def _parse_file(path: str) -> Dict[str, Any]:
+    """Worker: parse one file, reporting failures instead of raising"""
+    try:
+        result = lesson_parser.parse_lesson_file(path, answer_key_for(path))
+        result["error"] = None
+    except Exception as e:
+        result = {"challenges": [], "warnings": [], "elapsed": 0.0, "error": str(e)}
+    return result
+
+def ingest(targets: List[Tuple[str, Optional[int]]], workers: Optional[int] = None, strict: bool = False, dry_run: bool = False) -> Dict[str, Any]:
+    """Parse every (path, lesson_id) target in parallel and load the valid ones.
+
+    A file is skipped when it cannot be read, has no lesson id or one that
+    does not exist (all ids are checked with one query), yields no
+    challenges, or has warnings while `strict` is set. Returns a dict with
+    `files` (per-file summary), `challenges`, `options`, `parse_time`,
+    `write_time` and `elapsed` seconds.
+    """
+    start = time.perf_counter()
+    paths = [path for path, _ in targets]
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        results = list(executor.map(_parse_file, paths))
+    parse_time = time.perf_counter() - start
+
+    # One unknown lesson id must not abort the load of every other file
+    lessons = set() if dry_run else existing_lessons(sorted({i for _, i in targets if i is not None}))
+
+    files = []
+    batches = []
+    for (path, lesson_id), result in zip(targets, results):
+        summary = {
+            "file": path,
+            "lesson_id": lesson_id,
+            "challenges": len(result["challenges"]),
+            "options": sum(len(c["options"]) for c in result["challenges"]),
+            "warnings": result["warnings"],
+            "parse_time": result["elapsed"],
+            "loaded": False,
+            "error": result["error"],
+        }
+        if summary["error"] is None:
+            if lesson_id is None and not dry_run:
+                summary["error"] = "Falta el id de lección (<archivo>:<lesson_id>)"
+            elif not dry_run and lesson_id not in lessons:
+                summary["error"] = f"La lección {lesson_id} no existe"
+            elif not result["challenges"]:
+                summary["error"] = "No se encontraron preguntas"
+            elif strict and result["warnings"]:
+                summary["error"] = "Omitido por advertencias (--strict)"
+        if summary["error"] is None and not dry_run:
+            batches.append((lesson_id, result["challenges"]))
+            summary["loaded"] = True
+        files.append(summary)
+
+    created = {"challenges": 0, "options": 0}
+    write_start = time.perf_counter()
+    if batches:
+        created = lesson_parser.load_lessons(batches)
+    write_time = time.perf_counter() - write_start
+
+    return {
+        "files": files,
+        "challenges": created["challenges"],
+        "options": created["options"],
+        "parse_time": parse_time,
+        "write_time": write_time,
+        "elapsed": time.perf_counter() - start,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Carga varias lecciones desde archivos de texto en paralelo")
+    parser.add_argument("targets", nargs="+", help="archivos como <archivo>:<lesson_id>")
+    parser.add_argument("--workers", type=int, default=None, help="procesos de análisis (por defecto, uno por núcleo)")
+    parser.add_argument("--strict", action="store_true", help="omitir los archivos con advertencias")
+    parser.add_argument("--dry-run", action="store_true", help="solo analizar, sin escribir en la base de datos")
+    parser.add_argument("--quiet", action="store_true", help="no listar cada advertencia")
+    args = parser.parse_args()
+
+    result = ingest([parse_target(t) for t in args.targets], args.workers, args.strict, args.dry_run)
+
+    print(f"{'Archivo':<40} {'Lección':>7} {'Desafíos':>8} {'Opciones':>8} {'Avisos':>6} {'ms':>8}  Estado")
+    for f in result["files"]:
+        status = "cargado" if f["loaded"] else (f["error"] or "analizado")
+        lesson = f["lesson_id"] if f["lesson_id"] is not None else "-"
+        print(f"{f['file']:<40} {lesson:>7} {f['challenges']:>8} {f['options']:>8} {len(f['warnings']):>6} {f['parse_time'] * 1000:>8.1f}  {status}")
+        if not args.quiet:
+            for warning in f["warnings"]:
+                print(f"    ⚠️ {warning}")
+
+    failed = sum(1 for f in result["files"] if f["error"])
+    print(
+        f"\n{len(result['files'])} archivos ({failed} con errores) · "
+        f"{result['challenges']} desafíos y {result['options']} opciones creados · "
+        f"análisis {result['parse_time']:.2f} s · escritura {result['write_time']:.2f} s · total {result['elapsed']:.2f} s"
+    )
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,290 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Lesson text parser for FIBRA Content Management System
+Reads lesson files such as leccion1.txt / leccion2.txt line by line into
+challenge and option records, and loads a whole lesson in one transaction.
+
+Supported question formats:
+    Artículo 8 Bis Texto con ______ a) Opción. b) Opción. c) Opción.
+    **1. (Artículo 130)**            followed by the question line and
+    a. Opción                        one option per line, or everything
+    b. **Opción correcta**           inline on the numbered line
+
+The correct option is the one wrapped in **bold**, or the letter given for
+the question in an answer key file (one "<question number> <letter>" per
+line, numbered in file order starting at 1; the key wins over markers).
+
+Usage:
+    python lesson_parser.py leccion2.txt --lesson-id 17 [--answers clave.txt] [--dry-run]
+"""
+
+import argparse
+import re
+import sys
+import time
+from typing import List, Dict, Optional, Any, Iterable, Iterator, IO, Tuple
+
+CHALLENGE_TYPE = "SELECT"
+
+# "Artículo 8 Bis Texto..." (question, blank and inline options on one line)
+ARTICLE_LINE = re.compile(r"^Artículo\s+(\d+(?:\s+(?:Bis|Ter|Quáter|Quater))?)\b\s*(.*)$")
+# "**1. (Artículo 130)**" or "1. (Artículo 138) Texto... a. ... b. ..."
+NUMBERED_LINE = re.compile(r"^(?:\*\*)?\d+\.\s*\(Artículo\s+([^)]+)\)(?:\*\*)?\s*(.*)$")
+# "a. Opción" / "b) **Opción correcta**"
+OPTION_LINE = re.compile(r"^([a-e])[.)]\s+(.*)$")
+# Headings, chapter lines and separators end the current question
+BREAK_LINE = re.compile(r"^(?:-{3,}|#|CAPÍTULO\b|Capítulo\b|TÍTULO\b)")
+BLANK = re.compile(r"_{3,}")
+BOLD = re.compile(r"\*\*(.+?)\*\*")
+ANSWER_LINE = re.compile(r"^\s*(\d+)\s*[.,:;)\s]\s*([a-eA-E])\b")
+
+OPTION_LETTERS = "abcde"
+# " a) " / " b. " markers of options written inline, one per letter
+INLINE_OPTION = [re.compile(rf"(?:^|\s){letter}[.)]\s") for letter in OPTION_LETTERS]
+
+def _clean(text: str) -> str:
+    """Drop markdown bold markers, shorten blanks and collapse whitespace"""
+    text = BOLD.sub(r"\1", text)
+    text = BLANK.sub("_____", text)
+    return " ".join(text.split())
+
+def _split_inline_options(text: str):
+    """Split "question a) x b) y c) z" into the question and its options.
+
+    Option markers are only accepted in letter order, so a stray "c." inside
+    the question does not start an option.
+    """
+    positions = []
+    start = 0
+    for marker in INLINE_OPTION:
+        match = marker.search(text, start)
+        if not match:
+            break
+        positions.append((match.start(), match.end()))
+        start = match.end()
+    if len(positions) < 2:
+        return text, []
+    question = text[:positions[0][0]]
+    options = [
+        text[end:positions[i + 1][0] if i + 1 < len(positions) else len(text)]
+        for i, (_, end) in enumerate(positions)
+    ]
+    return question, options
+
+def _option(raw: str) -> Dict[str, Any]:
+    raw = raw.strip()
+    marked = raw.startswith("**") and raw.rstrip(".").endswith("**")
+    return {"text": _clean(raw), "correct": marked}
+
+def _new_challenge(article: str, text: str, line: int, chapter: Optional[str]) -> Dict[str, Any]:
+    challenge = {
+        "article": article,
+        "question": "",
+        "options": [],
+        "chapter": chapter,
+        "line": line,
+    }
+    question, options = _split_inline_options(text)
+    challenge["question"] = question
+    challenge["options"] = [_option(o) for o in options]
+    return challenge
+
+def parse_lesson(lines: Iterable[str]) -> Iterator[Dict[str, Any]]:
+    """Parse lesson text into challenge records, yielding each question as
+    soon as it is complete.
+
+    Each record has `order` (position in the file, from 1), `article`,
+    `question`, `type`, `chapter`, `line` (first line number) and `options`
+    (list of dicts with text and correct, marked from **bold**).
+    """
+    current: Optional[Dict[str, Any]] = None
+    chapter: Optional[str] = None
+    order = 0
+
+    def finish(challenge):
+        nonlocal order
+        order += 1
+        challenge["order"] = order
+        challenge["type"] = CHALLENGE_TYPE
+        challenge["question"] = f"Artículo {challenge['article']} {_clean(challenge['question'])}".strip()
+        return challenge
+
+    for number, raw in enumerate(lines, start=1):
+        line = raw.strip()
+        if not line:
+            continue
+
+        match = NUMBERED_LINE.match(line) or ARTICLE_LINE.match(line)
+        if match and match.re is ARTICLE_LINE and not _split_inline_options(match.group(2))[1]:
+            # Only a line with its own options starts an "Artículo N" question
+            match = None
+        if match:
+            if current:
+                yield finish(current)
+            current = _new_challenge(" ".join(match.group(1).split()), match.group(2), number, chapter)
+            continue
+
+        if BREAK_LINE.match(line):
+            if current:
+                yield finish(current)
+                current = None
+            heading = line.lstrip("#").strip()
+            if heading.upper().startswith("CAPÍTULO"):
+                chapter = _clean(heading)
+            continue
+
+        if current is None:
+            continue
+        option = OPTION_LINE.match(line)
+        if option:
+            current["options"].append(_option(option.group(2)))
+        elif not current["options"]:
+            # Question text on the line(s) after a "**N. (Artículo X)**" header
+            current["question"] += " " + line
+        else:
+            # Any other text after the options closes the question
+            yield finish(current)
+            current = None
+    if current:
+        yield finish(current)
+
+def read_answer_key(file: IO[str]) -> Dict[int, int]:
+    """Read an answer key: question number (file order, from 1) -> option index"""
+    key = {}
+    for raw in file:
+        line = raw.split("#", 1)[0]
+        match = ANSWER_LINE.match(line)
+        if match:
+            key[int(match.group(1))] = OPTION_LETTERS.index(match.group(2).lower())
+    return key
+
+def apply_answer_key(challenges: Iterable[Dict[str, Any]], key: Dict[int, int]) -> Iterator[Dict[str, Any]]:
+    """Mark the correct option of each challenge from an answer key"""
+    for challenge in challenges:
+        answer = key.get(challenge["order"])
+        if answer is not None and answer < len(challenge["options"]):
+            for i, option in enumerate(challenge["options"]):
+                option["correct"] = i == answer
+        yield challenge
+
+def check_challenge(challenge: Dict[str, Any]) -> List[str]:
+    """Warnings for a parsed challenge (missing options or correct answer)"""
+    warnings = []
+    where = f"Pregunta {challenge['order']} (línea {challenge['line']}, Artículo {challenge['article']})"
+    if len(challenge["options"]) < 2:
+        warnings.append(f"{where}: tiene {len(challenge['options'])} opciones")
+    correct = sum(1 for o in challenge["options"] if o["correct"])
+    if correct == 0:
+        warnings.append(f"{where}: sin respuesta correcta")
+    elif correct > 1:
+        warnings.append(f"{where}: {correct} respuestas correctas")
+    return warnings
+
+def parse_lesson_file(path: str, answer_key: Optional[str] = None) -> Dict[str, Any]:
+    """Parse a lesson file (and optional answer key file).
+
+    Returns a dict with `challenges`, `warnings` and `elapsed` seconds.
+    """
+    start = time.perf_counter()
+    with open(path, encoding="utf-8-sig") as f:
+        challenges: Iterable[Dict[str, Any]] = parse_lesson(f)
+        if answer_key:
+            with open(answer_key, encoding="utf-8-sig") as k:
+                key = read_answer_key(k)
+            challenges = apply_answer_key(challenges, key)
+        challenges = list(challenges)
+    warnings = [w for c in challenges for w in check_challenge(c)]
+    seen: Dict[str, int] = {}
+    for c in challenges:
+        first = seen.setdefault(c["question"], c["order"])
+        if first != c["order"]:
+            warnings.append(f"Pregunta {c['order']} (línea {c['line']}): repite la pregunta {first}")
+    return {"challenges": challenges, "warnings": warnings, "elapsed": time.perf_counter() - start}
+
+def load_lessons(batches: List[Tuple[int, List[Dict[str, Any]]]], session=None) -> Dict[str, int]:
+    """Insert the parsed challenges of several lessons, given as
+    (lesson_id, challenges) pairs, in one transaction (or inside `session`).
+
+    Each lesson's challenges go after its existing ones; all challenges and
+    then all options are written with one bulk insert each. Returns the
+    number of challenges and options created.
+    """
+    import db_utils
+
+    if session is None:
+        with db_utils.transaction() as session:
+            return load_lessons(batches, session)
+
+    session.execute(
+        'SELECT lesson_id, MAX("order") AS last FROM challenges WHERE lesson_id = ANY(%s) GROUP BY lesson_id',
+        (list({lesson_id for lesson_id, _ in batches}),)
+    )
+    next_order = {r["lesson_id"]: r["last"] + 1 for r in session.fetchall()}
+    rows = []
+    for lesson_id, challenges in batches:
+        first_order = next_order.get(lesson_id, 1)
+        rows.extend(
+            {
+                "lesson_id": lesson_id,
+                "type": c["type"],
+                "question": c["question"],
+                "order": first_order + i,
+                "audio_src": None,
+            }
+            for i, c in enumerate(challenges)
+        )
+        next_order[lesson_id] = first_order + len(challenges)
+    challenge_ids = db_utils.create_challenges_bulk(rows, session=session)
+    all_challenges = [c for _, challenges in batches for c in challenges]
+    option_ids = db_utils.create_challenge_options_bulk([
+        {
+            "challenge_id": challenge_id,
+            "text": o["text"],
+            "correct": o["correct"],
+            "image_src": None,
+            "audio_src": None,
+        }
+        for challenge_id, c in zip(challenge_ids, all_challenges)
+        for o in c["options"]
+    ], session=session)
+    return {"challenges": len(challenge_ids), "options": len(option_ids)}
+
+def load_lesson(lesson_id: int, challenges: List[Dict[str, Any]], session=None) -> Dict[str, int]:
+    """Insert parsed challenges and their options into a lesson, after its
+    existing challenges, in one transaction (or inside `session`).
+
+    Returns the number of challenges and options created.
+    """
+    return load_lessons([(lesson_id, challenges)], session)
+
+def main():
+    parser = argparse.ArgumentParser(description="Carga una lección desde un archivo de texto")
+    parser.add_argument("file", help="archivo de la lección (p. ej. leccion2.txt)")
+    parser.add_argument("--lesson-id", type=int, help="lección donde se crean los desafíos")
+    parser.add_argument("--answers", help="clave de respuestas: una línea '<número> <letra>' por pregunta")
+    parser.add_argument("--dry-run", action="store_true", help="solo analizar, sin escribir en la base de datos")
+    parser.add_argument("--strict", action="store_true", help="no cargar si hay advertencias")
+    args = parser.parse_args()
+
+    result = parse_lesson_file(args.file, args.answers)
+    challenges = result["challenges"]
+    options = sum(len(c["options"]) for c in challenges)
+    print(f"{args.file}: {len(challenges)} desafíos, {options} opciones en {result['elapsed'] * 1000:.1f} ms")
+    for warning in result["warnings"]:
+        print(f"  ⚠️ {warning}")
+
+    if args.dry_run:
+        return 0
+    if args.lesson_id is None:
+        parser.error("--lesson-id es obligatorio salvo con --dry-run")
+    if args.strict and result["warnings"]:
+        print("No se cargó nada: corrige las advertencias o quita --strict")
+        return 1
+
+    created = load_lesson(args.lesson_id, challenges)
+    print(f"Lección {args.lesson_id}: {created['challenges']} desafíos y {created['options']} opciones creados")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,111 @@
+"""
+FIBRA Content Management System
+Course management page
+"""
+
+import streamlit as st
+import sys
+import os
+
+# Add the application directory to path for imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import db_utils
+import common
+
+common.setup_page("Cursos · FIBRA CMS")
+
+st.markdown("## Gestión de Cursos")
+
+tab1, tab2, tab3 = st.tabs(["📋 Ver Cursos", "➕ Crear/Editar Curso", "🌳 Estructura"])
+
+with tab1:
+    st.markdown("### Cursos existentes")
+    try:
+        courses = db_utils.get_courses()
+        if courses:
+            for course in courses:
+                col1, col2, col3 = st.columns([3, 1, 1])
+                with col1:
+                    st.write(f"**{course['title']}** (ID: {course['id']})")
+                    st.caption(f"Imagen: {course['image_src']}")
+                with col2:
+                    if st.button("✏️ Editar", key=f"edit_course_{course['id']}"):
+                        st.session_state['edit_course'] = course
+                        st.rerun()
+                with col3:
+                    common.delete_button('course', course['id'], key=f"delete_course_{course['id']}")
+                if common.delete_confirmation('course', course['id'], course['title'], key=f"delete_course_{course['id']}"):
+                    st.success(f"Curso '{course['title']}' eliminado")
+                    st.rerun()
+                st.divider()
+        else:
+            st.info("No hay cursos creados aún")
+    except Exception as e:
+        st.error(f"Error al cargar cursos: {str(e)}")
+
+with tab2:
+    st.markdown("### Crear o editar curso")
+    
+    # Check if editing
+    edit_course = st.session_state.get('edit_course', None)
+    
+    with st.form("course_form"):
+        title = st.text_input("Título del curso", value=edit_course['title'] if edit_course else "")
+        image_src = st.text_input("URL de la imagen", value=edit_course['image_src'] if edit_course else "")
+        
+        col1, col2 = st.columns(2)
+        with col1:
+            submit = st.form_submit_button("💾 Guardar")
+        with col2:
+            cancel = st.form_submit_button("❌ Cancelar")
+        
+        if submit and title and image_src:
+            try:
+                if edit_course:
+                    db_utils.update_course(edit_course['id'], title, image_src)
+                    st.success(f"Curso '{title}' actualizado correctamente")
+                    st.session_state.pop('edit_course', None)
+                else:
+                    course_id = db_utils.create_course(title, image_src)
+                    st.success(f"Curso '{title}' creado con ID: {course_id}")
+                st.rerun()
+            except Exception as e:
+                st.error(f"Error al guardar curso: {str(e)}")
+        elif submit:
+            st.error("Por favor completa todos los campos")
+        
+        if cancel:
+            st.session_state.pop('edit_course', None)
+            st.rerun()
+
+with tab3:
+    st.markdown("### Estructura del curso")
+    
+    try:
+        courses = db_utils.list_courses()
+        if courses:
+            course_options = {c['id']: c['title'] for c in courses}
+            selected_course = st.selectbox(
+                "Curso",
+                options=list(course_options.keys()),
+                format_func=lambda x: course_options[x],
+                key="tree_course"
+            )
+            
+            tree = db_utils.get_course_tree(selected_course)
+            if tree and tree.units:
+                for unit in tree.units:
+                    with st.expander(f"**{unit['title']}** ({len(unit['lessons'])} lecciones)"):
+                        for lesson in unit['lessons']:
+                            option_count = sum(len(c['options']) for c in lesson['challenges'])
+                            st.write(f"📝 {lesson['title']} — {len(lesson['challenges'])} desafíos, {option_count} opciones")
+                st.caption(f"{len(tree.lessons())} lecciones, {len(tree.challenges())} desafíos, {len(tree.exams)} exámenes")
+            else:
+                st.info("Este curso no tiene unidades")
+        else:
+            st.info("No hay cursos creados aún")
+    except Exception as e:
+        st.error(f"Error al cargar la estructura: {str(e)}")
+
+common.footer()
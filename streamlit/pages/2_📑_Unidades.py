@@ -0,0 +1,111 @@
+"""
+FIBRA Content Management System
+Unit management page
+"""
+
+import streamlit as st
+import sys
+import os
+
+# Add the application directory to path for imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import db_utils
+import common
+
+common.setup_page("Unidades · FIBRA CMS")
+
+st.markdown("## Gestión de Unidades")
+
+tab1, tab2 = st.tabs(["📋 Ver Unidades", "➕ Crear/Editar Unidad"])
+
+with tab1:
+    st.markdown("### Unidades existentes")
+    
+    # Course filter
+    try:
+        courses = db_utils.list_courses()
+        if courses:
+            course_options = {c['id']: c['title'] for c in courses}
+            selected_course = st.selectbox(
+                "Filtrar por curso:",
+                options=[None] + list(course_options.keys()),
+                format_func=lambda x: "Todos los cursos" if x is None else course_options[x]
+            )
+            
+            units = db_utils.get_units(selected_course)
+            if units:
+                for unit in units:
+                    col1, col2, col3 = st.columns([3, 1, 1])
+                    with col1:
+                        st.write(f"**{unit['title']}** (ID: {unit['id']}, Orden: {unit['order']})")
+                        st.caption(f"Descripción: {unit['description']}")
+                        st.caption(f"Curso ID: {unit['course_id']}")
+                    with col2:
+                        if st.button("✏️ Editar", key=f"edit_unit_{unit['id']}"):
+                            st.session_state['edit_unit'] = unit
+                            st.rerun()
+                    with col3:
+                        common.delete_button('unit', unit['id'], key=f"delete_unit_{unit['id']}")
+                    if common.delete_confirmation('unit', unit['id'], unit['title'], key=f"delete_unit_{unit['id']}"):
+                        st.success(f"Unidad '{unit['title']}' eliminada")
+                        st.rerun()
+                    st.divider()
+            else:
+                st.info("No hay unidades para este filtro")
+        else:
+            st.warning("Primero debes crear cursos")
+    except Exception as e:
+        st.error(f"Error al cargar unidades: {str(e)}")
+
+with tab2:
+    st.markdown("### Crear o editar unidad")
+    
+    try:
+        courses = db_utils.list_courses()
+        if courses:
+            edit_unit = st.session_state.get('edit_unit', None)
+            
+            with st.form("unit_form"):
+                course_options = {c['id']: c['title'] for c in courses}
+                course_id = st.selectbox(
+                    "Curso",
+                    options=list(course_options.keys()),
+                    format_func=lambda x: course_options[x],
+                    index=list(course_options.keys()).index(edit_unit['course_id']) if edit_unit else 0
+                )
+                
+                title = st.text_input("Título de la unidad", value=edit_unit['title'] if edit_unit else "")
+                description = st.text_area("Descripción", value=edit_unit['description'] if edit_unit else "")
+                order = st.number_input("Orden", min_value=1, value=edit_unit['order'] if edit_unit else 1)
+                
+                col1, col2 = st.columns(2)
+                with col1:
+                    submit = st.form_submit_button("💾 Guardar")
+                with col2:
+                    cancel = st.form_submit_button("❌ Cancelar")
+                
+                if submit and title and description:
+                    try:
+                        if edit_unit:
+                            db_utils.update_unit(edit_unit['id'], title, description, course_id, order)
+                            st.success(f"Unidad '{title}' actualizada correctamente")
+                            st.session_state.pop('edit_unit', None)
+                        else:
+                            unit_id = db_utils.create_unit(title, description, course_id, order)
+                            st.success(f"Unidad '{title}' creada con ID: {unit_id}")
+                        st.rerun()
+                    except Exception as e:
+                        st.error(f"Error al guardar unidad: {str(e)}")
+                elif submit:
+                    st.error("Por favor completa todos los campos")
+                
+                if cancel:
+                    st.session_state.pop('edit_unit', None)
+                    st.rerun()
+        else:
+            st.warning("Primero debes crear cursos")
+    except Exception as e:
+        st.error(f"Error: {str(e)}")
+
+common.footer()
@@ -0,0 +1,178 @@
+"""
+FIBRA Content Management System
+Lesson management page
+"""
+
+import streamlit as st
+import sys
+import os
+
+# Add the application directory to path for imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import db_utils
+import common
+
+common.setup_page("Lecciones · FIBRA CMS")
+
+st.markdown("## Gestión de Lecciones")
+
+tab1, tab2, tab3 = st.tabs(["📋 Ver Lecciones", "➕ Crear/Editar Lección", "🔀 Reordenar"])
+
+with tab1:
+    st.markdown("### Lecciones existentes")
+    
+    try:
+        courses = db_utils.list_courses()
+        if courses:
+            course_options = {c['id']: c['title'] for c in courses}
+            selected_course = st.selectbox(
+                "Filtrar por curso:",
+                options=[None] + list(course_options.keys()),
+                format_func=lambda x: "Todos los cursos" if x is None else course_options[x],
+                key="lesson_filter_course"
+            )
+            
+            units = db_utils.list_units(selected_course)
+            if units:
+                unit_options = {u['id']: u['title'] for u in units}
+                selected_unit = st.selectbox(
+                    "Filtrar por unidad:",
+                    options=[None] + list(unit_options.keys()),
+                    format_func=lambda x: "Todas las unidades" if x is None else unit_options[x],
+                    key="lesson_filter_unit"
+                )
+                
+                lessons = db_utils.get_lessons(selected_unit)
+                if lessons:
+                    for lesson in lessons:
+                        col1, col2, col3 = st.columns([3, 1, 1])
+                        with col1:
+                            st.write(f"**{lesson['title']}** (ID: {lesson['id']}, Orden: {lesson['order']})")
+                            st.caption(f"Unidad ID: {lesson['unit_id']}")
+                        with col2:
+                            if st.button("✏️ Editar", key=f"edit_lesson_{lesson['id']}"):
+                                st.session_state['edit_lesson'] = lesson
+                                st.rerun()
+                        with col3:
+                            common.delete_button('lesson', lesson['id'], key=f"delete_lesson_{lesson['id']}")
+                        if common.delete_confirmation('lesson', lesson['id'], lesson['title'], key=f"delete_lesson_{lesson['id']}"):
+                            st.success(f"Lección '{lesson['title']}' eliminada")
+                            st.rerun()
+                        st.divider()
+                else:
+                    st.info("No hay lecciones para este filtro")
+            else:
+                st.info("No hay unidades para este curso")
+        else:
+            st.warning("Primero debes crear cursos")
+    except Exception as e:
+        st.error(f"Error al cargar lecciones: {str(e)}")
+
+with tab2:
+    st.markdown("### Crear o editar lección")
+    
+    try:
+        courses = db_utils.list_courses()
+        if courses:
+            edit_lesson = st.session_state.get('edit_lesson', None)
+            
+            with st.form("lesson_form"):
+                course_options = {c['id']: c['title'] for c in courses}
+                course_id = st.selectbox(
+                    "Curso",
+                    options=list(course_options.keys()),
+                    format_func=lambda x: course_options[x],
+                    key="lesson_form_course"
+                )
+                
+                units = db_utils.list_units(course_id)
+                if units:
+                    unit_options = {u['id']: u['title'] for u in units}
+                    unit_id = st.selectbox(
+                        "Unidad",
+                        options=list(unit_options.keys()),
+                        format_func=lambda x: unit_options[x],
+                        index=list(unit_options.keys()).index(edit_lesson['unit_id']) if edit_lesson and edit_lesson['unit_id'] in unit_options else 0
+                    )
+                    
+                    title = st.text_input("Título de la lección", value=edit_lesson['title'] if edit_lesson else "")
+                    if edit_lesson:
+                        default_order = edit_lesson['order']
+                    else:
+                        # After the last lesson, leaving room for later inserts
+                        unit_lessons = db_utils.get_lessons(unit_id)
+                        default_order = db_utils.order_between(unit_lessons[-1]['order'] if unit_lessons else None, None)
+                    order = st.number_input("Orden", min_value=1, value=default_order)
+                    
+                    col1, col2 = st.columns(2)
+                    with col1:
+                        submit = st.form_submit_button("💾 Guardar")
+                    with col2:
+                        cancel = st.form_submit_button("❌ Cancelar")
+                    
+                    if submit and title:
+                        try:
+                            if edit_lesson:
+                                db_utils.update_lesson(edit_lesson['id'], title, unit_id, order)
+                                st.success(f"Lección '{title}' actualizada correctamente")
+                                st.session_state.pop('edit_lesson', None)
+                            else:
+                                lesson_id = db_utils.create_lesson(title, unit_id, order)
+                                st.success(f"Lección '{title}' creada con ID: {lesson_id}")
+                            st.rerun()
+                        except Exception as e:
+                            st.error(f"Error al guardar lección: {str(e)}")
+                    elif submit:
+                        st.error("Por favor completa todos los campos")
+                    
+                    if cancel:
+                        st.session_state.pop('edit_lesson', None)
+                        st.rerun()
+                else:
+                    st.warning("No hay unidades en este curso. Crea una unidad primero.")
+        else:
+            st.warning("Primero debes crear cursos")
+    except Exception as e:
+        st.error(f"Error: {str(e)}")
+
+with tab3:
+    st.markdown("### Reordenar lecciones de una unidad")
+    st.caption("Escribe la nueva posición de cada lección (por ejemplo 2.5 para ubicarla entre la 2 y la 3) y guarda: todo el orden se aplica de una vez.")
+    
+    try:
+        courses = db_utils.list_courses()
+        if courses:
+            course_options = {c['id']: c['title'] for c in courses}
+            course_id = st.selectbox(
+                "Curso:",
+                options=list(course_options.keys()),
+                format_func=lambda x: course_options[x],
+                key="reorder_lesson_course"
+            )
+            units = db_utils.list_units(course_id)
+            if units:
+                unit_options = {u['id']: u['title'] for u in units}
+                unit_id = st.selectbox(
+                    "Unidad:",
+                    options=list(unit_options.keys()),
+                    format_func=lambda x: unit_options[x],
+                    key="reorder_lesson_unit"
+                )
+                lessons = db_utils.list_lessons(unit_id)
+                if lessons:
+                    new_order = common.reorder_editor(lessons, 'title', f"reorder_lessons_{unit_id}")
+                    if new_order:
+                        db_utils.reorder_lessons(unit_id, new_order)
+                        st.success("Orden de lecciones actualizado")
+                        st.rerun()
+                else:
+                    st.info("No hay lecciones en esta unidad")
+            else:
+                st.info("No hay unidades para este curso")
+        else:
+            st.warning("Primero debes crear cursos")
+    except Exception as e:
+        st.error(f"Error al reordenar lecciones: {str(e)}")
+
+common.footer()
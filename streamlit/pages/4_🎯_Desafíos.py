@@ -0,0 +1,354 @@
+"""
+FIBRA Content Management System
+Challenge and answer option management page
+"""
+
+import streamlit as st
+import sys
+import os
+
+# Add the application directory to path for imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import db_utils
+import common
+
+common.setup_page("Desafíos · FIBRA CMS")
+
+st.markdown("## Gestión de Desafíos")
+
+tab1, tab2, tab3, tab4, tab5 = st.tabs(["📋 Ver Desafíos", "➕ Crear/Editar Desafío", "🎲 Opciones de Respuesta", "🔁 Duplicados", "🔀 Reordenar"])
+
+with tab1:
+    st.markdown("### Desafíos existentes")
+    
+    try:
+        courses = db_utils.list_courses()
+        if courses:
+            course_options = {c['id']: c['title'] for c in courses}
+            selected_course = st.selectbox(
+                "Filtrar por curso:",
+                options=[None] + list(course_options.keys()),
+                format_func=lambda x: "Todos los cursos" if x is None else course_options[x],
+                key="challenge_filter_course"
+            )
+            
+            units = db_utils.list_units(selected_course)
+            if units:
+                unit_options = {u['id']: u['title'] for u in units}
+                selected_unit = st.selectbox(
+                    "Filtrar por unidad:",
+                    options=[None] + list(unit_options.keys()),
+                    format_func=lambda x: "Todas las unidades" if x is None else unit_options[x],
+                    key="challenge_filter_unit"
+                )
+                
+                lessons = db_utils.list_lessons(selected_unit)
+                if lessons:
+                    lesson_options = {l['id']: l['title'] for l in lessons}
+                    selected_lesson = st.selectbox(
+                        "Filtrar por lección:",
+                        options=[None] + list(lesson_options.keys()),
+                        format_func=lambda x: "Todas las lecciones" if x is None else lesson_options[x],
+                        key="challenge_filter_lesson"
+                    )
+                    
+                    page_key = f"challenge_list_page_{selected_lesson}"
+                    challenge_page = db_utils.get_challenges_page(selected_lesson, after=common.page_cursor(page_key))
+                    challenges = challenge_page['items']
+                    lazy_options = st.toggle("Cargar opciones al abrir cada desafío", value=True, key="challenge_lazy_options")
+                    if challenges:
+                        # Lazy mode: only challenge headers now, options on demand per challenge.
+                        # Otherwise one query for the options of every listed challenge.
+                        options_by_challenge = {} if lazy_options else db_utils.get_challenge_options_batch([c['id'] for c in challenges])
+                        for challenge in challenges:
+                            with st.expander(f"**{challenge['question']}** (ID: {challenge['id']})"):
+                                st.write(f"**Tipo:** {challenge['type']}")
+                                st.write(f"**Orden:** {challenge['order']}")
+                                st.write(f"**Lección ID:** {challenge['lesson_id']}")
+                                if challenge['audio_src']:
+                                    st.write(f"**Audio:** {challenge['audio_src']}")
+                                
+                                # Show options
+                                show_key = f"show_options_{challenge['id']}"
+                                options_loaded = not lazy_options or st.session_state.get(show_key, False)
+                                if not options_loaded and st.button("🎲 Ver opciones", key=f"load_options_{challenge['id']}"):
+                                    st.session_state[show_key] = True
+                                    options_loaded = True
+                                if options_loaded:
+                                    if lazy_options:
+                                        options = db_utils.get_challenge_options(challenge['id'])
+                                    else:
+                                        options = options_by_challenge.get(challenge['id'], [])
+                                    if options:
+                                        correct_count = sum(1 for opt in options if opt['correct'])
+                                        st.markdown(f"**Opciones de respuesta:** {len(options)} ({correct_count} correcta{'s' if correct_count != 1 else ''})")
+                                        for opt in options:
+                                            correct_icon = "✅" if opt['correct'] else "❌"
+                                            st.write(f"{correct_icon} {opt['text']}")
+                                    else:
+                                        st.caption("Sin opciones de respuesta")
+                                
+                                col1, col2 = st.columns(2)
+                                with col1:
+                                    if st.button("✏️ Editar", key=f"edit_challenge_{challenge['id']}"):
+                                        st.session_state['edit_challenge'] = challenge
+                                        st.rerun()
+                                with col2:
+                                    if st.button("🗑️ Eliminar", key=f"delete_challenge_{challenge['id']}"):
+                                        if st.session_state.get(f"confirm_delete_challenge_{challenge['id']}", False):
+                                            db_utils.delete_challenge(challenge['id'])
+                                            st.success(f"Desafío eliminado")
+                                            st.rerun()
+                                        else:
+                                            st.session_state[f"confirm_delete_challenge_{challenge['id']}"] = True
+                                            st.warning("Haz clic de nuevo para confirmar")
+                        common.page_navigation(page_key, challenge_page['next_cursor'])
+                    else:
+                        st.info("No hay desafíos para este filtro")
+                else:
+                    st.info("No hay lecciones para esta unidad")
+            else:
+                st.info("No hay unidades para este curso")
+        else:
+            st.warning("Primero debes crear cursos")
+    except Exception as e:
+        st.error(f"Error al cargar desafíos: {str(e)}")
+
+with tab2:
+    st.markdown("### Crear o editar desafío")
+    
+    try:
+        courses = db_utils.list_courses()
+        if courses:
+            edit_challenge = st.session_state.get('edit_challenge', None)
+            
+            with st.form("challenge_form"):
+                course_options = {c['id']: c['title'] for c in courses}
+                course_id = st.selectbox(
+                    "Curso",
+                    options=list(course_options.keys()),
+                    format_func=lambda x: course_options[x],
+                    key="challenge_form_course"
+                )
+                
+                units = db_utils.list_units(course_id)
+                if units:
+                    unit_options = {u['id']: u['title'] for u in units}
+                    unit_id = st.selectbox(
+                        "Unidad",
+                        options=list(unit_options.keys()),
+                        format_func=lambda x: unit_options[x],
+                        key="challenge_form_unit"
+                    )
+                    
+                    lessons = db_utils.list_lessons(unit_id)
+                    if lessons:
+                        lesson_options = {l['id']: l['title'] for l in lessons}
+                        lesson_id = st.selectbox(
+                            "Lección",
+                            options=list(lesson_options.keys()),
+                            format_func=lambda x: lesson_options[x],
+                            index=list(lesson_options.keys()).index(edit_challenge['lesson_id']) if edit_challenge and edit_challenge['lesson_id'] in lesson_options else 0
+                        )
+                        
+                        challenge_type = st.selectbox(
+                            "Tipo de desafío",
+                            options=["SELECT", "ASSIST", "LISTEN"],
+                            index=["SELECT", "ASSIST", "LISTEN"].index(edit_challenge['type']) if edit_challenge else 0
+                        )
+                        
+                        question = st.text_area("Pregunta", value=edit_challenge['question'] if edit_challenge else "")
+                        if edit_challenge:
+                            default_order = edit_challenge['order']
+                        else:
+                            # After the last challenge, leaving room for later inserts
+                            lesson_challenges = db_utils.get_challenges(lesson_id)
+                            default_order = db_utils.order_between(lesson_challenges[-1]['order'] if lesson_challenges else None, None)
+                        order = st.number_input("Orden", min_value=1, value=default_order)
+                        audio_src = st.text_input("URL del audio (opcional)", value=edit_challenge.get('audio_src', '') if edit_challenge else "")
+                        
+                        new_options = []
+                        correct_index = 0
+                        if not edit_challenge:
+                            st.markdown("**Opciones de respuesta (opcional)**")
+                            new_options = [st.text_input(f"Opción {i + 1}", key=f"new_challenge_option_{i}") for i in range(4)]
+                            correct_index = st.selectbox(
+                                "Opción correcta",
+                                options=list(range(4)),
+                                format_func=lambda x: f"Opción {x + 1}"
+                            )
+                        
+                        col1, col2 = st.columns(2)
+                        with col1:
+                            submit = st.form_submit_button("💾 Guardar")
+                        with col2:
+                            cancel = st.form_submit_button("❌ Cancelar")
+                        
+                        if submit and question:
+                            try:
+                                audio_value = audio_src if audio_src else None
+                                if edit_challenge:
+                                    db_utils.update_challenge(edit_challenge['id'], lesson_id, challenge_type, question, order, audio_value)
+                                    st.success(f"Desafío actualizado correctamente")
+                                    st.session_state.pop('edit_challenge', None)
+                                else:
+                                    # Challenge and its options are saved together or not at all
+                                    with db_utils.transaction() as session:
+                                        challenge_id = db_utils.create_challenge(lesson_id, challenge_type, question, order, audio_value, session=session)
+                                        for i, option_text in enumerate(new_options):
+                                            if option_text:
+                                                db_utils.create_challenge_option(challenge_id, option_text, i == correct_index, session=session)
+                                    st.success(f"Desafío creado con ID: {challenge_id}")
+                                st.rerun()
+                            except Exception as e:
+                                st.error(f"Error al guardar desafío: {str(e)}")
+                        elif submit:
+                            st.error("Por favor completa todos los campos obligatorios")
+                        
+                        if cancel:
+                            st.session_state.pop('edit_challenge', None)
+                            st.rerun()
+                    else:
+                        st.warning("No hay lecciones en esta unidad")
+                else:
+                    st.warning("No hay unidades en este curso")
+        else:
+            st.warning("Primero debes crear cursos")
+    except Exception as e:
+        st.error(f"Error: {str(e)}")
+
+with tab3:
+    st.markdown("### Gestionar opciones de respuesta")
+    
+    try:
+        challenge_page = db_utils.get_challenges_page(after=common.page_cursor("option_challenge_page"), label_length=db_utils.LABEL_LENGTH)
+        challenges = challenge_page['items']
+        if challenges:
+            challenge_options_dict = {c['id']: f"{c['label']} (ID: {c['id']})" for c in challenges}
+            selected_challenge = st.selectbox(
+                "Selecciona un desafío:",
+                options=list(challenge_options_dict.keys()),
+                format_func=lambda x: challenge_options_dict[x]
+            )
+            common.page_navigation("option_challenge_page", challenge_page['next_cursor'])
+            
+            st.markdown("#### Opciones existentes")
+            option_page_key = f"option_list_page_{selected_challenge}"
+            option_page = db_utils.get_challenge_options_page(selected_challenge, after=common.page_cursor(option_page_key))
+            options = option_page['items']
+            if options:
+                for opt in options:
+                    col1, col2 = st.columns([4, 1])
+                    with col1:
+                        correct_icon = "✅" if opt['correct'] else "❌"
+                        st.write(f"{correct_icon} **{opt['text']}** (ID: {opt['id']})")
+                        if opt['image_src']:
+                            st.caption(f"Imagen: {opt['image_src']}")
+                        if opt['audio_src']:
+                            st.caption(f"Audio: {opt['audio_src']}")
+                    with col2:
+                        if st.button("🗑️", key=f"delete_option_{opt['id']}"):
+                            db_utils.delete_challenge_option(opt['id'])
+                            st.success("Opción eliminada")
+                            st.rerun()
+                    st.divider()
+                common.page_navigation(option_page_key, option_page['next_cursor'])
+            else:
+                st.info("No hay opciones para este desafío")
+            
+            st.markdown("#### Agregar nueva opción")
+            with st.form("option_form"):
+                text = st.text_input("Texto de la opción")
+                correct = st.checkbox("¿Es la respuesta correcta?")
+                image_src = st.text_input("URL de imagen (opcional)")
+                audio_src = st.text_input("URL de audio (opcional)")
+                
+                if st.form_submit_button("➕ Agregar opción"):
+                    if text:
+                        try:
+                            img_value = image_src if image_src else None
+                            aud_value = audio_src if audio_src else None
+                            option_id = db_utils.create_challenge_option(selected_challenge, text, correct, img_value, aud_value)
+                            st.success(f"Opción creada con ID: {option_id}")
+                            st.rerun()
+                        except Exception as e:
+                            st.error(f"Error al crear opción: {str(e)}")
+                    else:
+                        st.error("El texto de la opción es obligatorio")
+        else:
+            st.warning("Primero debes crear desafíos")
+    except Exception as e:
+        st.error(f"Error: {str(e)}")
+
+with tab4:
+    st.markdown("### Detectar preguntas duplicadas")
+    st.caption("Compara todas las preguntas del catálogo por similitud de trigramas.")
+    
+    threshold = st.slider("Similitud mínima", min_value=0.3, max_value=1.0, value=db_utils.DUPLICATE_THRESHOLD, step=0.05)
+    if st.button("🔍 Buscar duplicados"):
+        try:
+            duplicates = db_utils.find_duplicate_challenges(threshold)
+            if duplicates:
+                st.warning(f"Se encontraron {len(duplicates)} pares de preguntas similares")
+                for dup in duplicates:
+                    st.write(f"**{dup['similarity']:.0%}** · ID {dup['id']} (Lección {dup['lesson_id']}) ↔ ID {dup['duplicate_id']} (Lección {dup['duplicate_lesson_id']})")
+                    st.caption(dup['question'])
+                    st.caption(dup['duplicate_question'])
+                    st.divider()
+            else:
+                st.success("No se encontraron preguntas duplicadas")
+        except Exception as e:
+            st.error(f"Error al buscar duplicados: {str(e)}")
+
+with tab5:
+    st.markdown("### Reordenar desafíos de una lección")
+    st.caption("Escribe la nueva posición de cada desafío (por ejemplo 2.5 para ubicarlo entre el 2 y el 3) y guarda: todo el orden se aplica de una vez.")
+    
+    try:
+        courses = db_utils.list_courses()
+        if courses:
+            course_options = {c['id']: c['title'] for c in courses}
+            course_id = st.selectbox(
+                "Curso:",
+                options=list(course_options.keys()),
+                format_func=lambda x: course_options[x],
+                key="reorder_challenge_course"
+            )
+            units = db_utils.list_units(course_id)
+            if units:
+                unit_options = {u['id']: u['title'] for u in units}
+                unit_id = st.selectbox(
+                    "Unidad:",
+                    options=list(unit_options.keys()),
+                    format_func=lambda x: unit_options[x],
+                    key="reorder_challenge_unit"
+                )
+                lessons = db_utils.list_lessons(unit_id)
+                if lessons:
+                    lesson_options = {l['id']: l['title'] for l in lessons}
+                    lesson_id = st.selectbox(
+                        "Lección:",
+                        options=list(lesson_options.keys()),
+                        format_func=lambda x: lesson_options[x],
+                        key="reorder_challenge_lesson"
+                    )
+                    challenges = db_utils.list_challenges(lesson_id)
+                    if challenges:
+                        new_order = common.reorder_editor(challenges, 'label', f"reorder_challenges_{lesson_id}")
+                        if new_order:
+                            db_utils.reorder_challenges(lesson_id, new_order)
+                            st.success("Orden de desafíos actualizado")
+                            st.rerun()
+                    else:
+                        st.info("No hay desafíos en esta lección")
+                else:
+                    st.info("No hay lecciones en esta unidad")
+            else:
+                st.info("No hay unidades para este curso")
+        else:
+            st.warning("Primero debes crear cursos")
+    except Exception as e:
+        st.error(f"Error al reordenar desafíos: {str(e)}")
+
+common.footer()
@@ -0,0 +1,49 @@
+"""
+FIBRA Content Management System
+Full-text search page
+"""
+
+import streamlit as st
+import sys
+import os
+
+# Add the application directory to path for imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import db_utils
+import common
+
+common.setup_page("Buscar · FIBRA CMS")
+
+st.markdown("## Buscar contenido")
+
+st.caption('Busca en preguntas y opciones de respuesta. Usa comillas para frases exactas ("Artículo 132"), OR para alternativas y - para excluir palabras.')
+query = st.text_input("Buscar", placeholder='Ej: "Artículo 132" imprudencia')
+
+if query:
+    try:
+        page_key = f"search_page_{query}"
+        offset = common.page_cursor(page_key) or 0
+        results = db_utils.search_content(query, offset=offset)
+        
+        if results['items']:
+            if results['total_capped']:
+                st.caption(f"Más de {db_utils.SEARCH_COUNT_LIMIT} resultados")
+            else:
+                st.caption(f"{results['total']} resultados")
+            for item in results['items']:
+                icon = "🎯" if item['kind'] == 'challenge' else "🎲"
+                label = "Desafío" if item['kind'] == 'challenge' else "Opción"
+                st.markdown(f"{icon} {item['snippet']}")
+                st.caption(f"{label} ID: {item['id']} · Desafío ID: {item['challenge_id']} · Lección ID: {item['lesson_id']}")
+                st.divider()
+            
+            next_offset = offset + len(results['items'])
+            has_next = next_offset < results['total'] or (results['total_capped'] and len(results['items']) == db_utils.PAGE_SIZE)
+            common.page_navigation(page_key, next_offset if has_next else None)
+        else:
+            st.info("No se encontraron resultados")
+    except Exception as e:
+        st.error(f"Error al buscar: {str(e)}")
+
+common.footer()
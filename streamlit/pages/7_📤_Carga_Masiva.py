@@ -0,0 +1,246 @@
+"""
+FIBRA Content Management System
+Bulk CSV upload page
+"""
+
+import streamlit as st
+import sys
+import os
+
+# Add the application directory to path for imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import db_utils
+import common
+
+common.setup_page("Carga Masiva · FIBRA CMS")
+
+st.markdown("## Carga Masiva de Contenido")
+
+st.info("""
+Esta sección te permite cargar contenido en lote desde archivos CSV.
+Descarga las plantillas, llénalas con tus datos y súbelas aquí.
+""")
+
+st.markdown("### 📥 Descargar Plantillas CSV")
+
+col1, col2 = st.columns(2)
+
+with col1:
+    st.markdown("**Plantilla de Cursos**")
+    st.code("id,title,image_src\n1,Español,/es.svg", language="csv")
+    
+    st.markdown("**Plantilla de Unidades**")
+    st.code("id,title,description,course_id,order\n1,Unidad 1,Aprende lo básico,1,1", language="csv")
+
+with col2:
+    st.markdown("**Plantilla de Lecciones**")
+    st.code("id,title,unit_id,order\n1,Lección 1,1,1", language="csv")
+    
+    st.markdown("**Plantilla de Desafíos**")
+    st.code("id,lesson_id,type,question,order,audio_src\n1,1,SELECT,¿Qué es esto?,1,", language="csv")
+
+st.markdown("### 📦 Exportar contenido")
+st.caption("Exporta un curso completo (unidades, lecciones, desafíos, opciones y exámenes) en el formato de las plantillas, listo para respaldos o edición sin conexión.")
+
+courses = db_utils.list_courses()
+export_options = {0: "Todo el catálogo", **{c['id']: c['title'] for c in courses}}
+col1, col2 = st.columns(2)
+with col1:
+    export_course_id = st.selectbox("Curso:", options=list(export_options.keys()), format_func=lambda x: export_options[x], key="export_course")
+with col2:
+    export_format = st.selectbox("Formato:", ["csv", "jsonl", "parquet"], key="export_format")
+
+st.caption("La descarga pasa por la memoria del servidor; para catálogos muy grandes usa `python csv_export.py salida.zip --zip`.")
+
+if st.button("📦 Generar exportación"):
+    import tempfile
+    import csv_export
+    try:
+        # The zip is built on disk and handed to the download button as a file
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "exportacion.zip")
+            with open(path, "wb") as archive, st.spinner("Exportando..."):
+                export = csv_export.export_course_zip(archive, export_course_id or None, export_format)
+            st.success(f"✅ {sum(f['rows'] for f in export['files'])} filas exportadas en {export['elapsed']:.1f} s")
+            with open(path, "rb") as archive:
+                st.download_button(
+                    "⬇️ Descargar exportación (.zip)",
+                    data=archive,
+                    file_name=f"fibra_{export_course_id or 'catalogo'}_{export_format}.zip",
+                    mime="application/zip"
+                )
+    except Exception as e:
+        st.error(f"Error al exportar: {str(e)}")
+
+st.markdown("### 📤 Subir archivo CSV")
+
+upload_type = st.selectbox(
+    "Tipo de contenido:",
+    ["Cursos", "Unidades", "Lecciones", "Desafíos", "Opciones de Respuesta"]
+)
+
+uploaded_file = st.file_uploader("Selecciona un archivo CSV", type=['csv'])
+
+if uploaded_file is not None:
+    try:
+        import hashlib
+        import pandas as pd
+        import csv_import
+        preview = pd.read_csv(uploaded_file, nrows=100)
+        uploaded_file.seek(0)
+        
+        st.markdown("### Vista previa de los datos")
+        st.caption("Primeras 100 filas del archivo")
+        st.dataframe(preview)
+        
+        if upload_type == "Desafíos" and 'question' in preview.columns:
+            questions = pd.read_csv(uploaded_file, usecols=['question'])['question'].dropna().astype(str).tolist()
+            uploaded_file.seek(0)
+            similar = db_utils.find_similar_challenges(questions)
+            if similar:
+                st.warning(f"⚠️ {len({m['input_index'] for m in similar})} preguntas del archivo se parecen a desafíos existentes")
+                st.dataframe(pd.DataFrame([{
+                    'Fila': m['input_index'] + 1,
+                    'Pregunta del archivo': m['input_question'],
+                    'Desafío existente (ID)': m['id'],
+                    'Lección ID': m['lesson_id'],
+                    'Pregunta existente': m['question'],
+                    'Similitud': f"{m['similarity']:.0%}",
+                } for m in similar]))
+        
+        take_snapshot = st.checkbox(
+            "📸 Crear un respaldo antes de guardar",
+            value=True,
+            help="Permite deshacer la carga desde la sección Respaldos"
+        )
+        
+        def snapshot_before_write():
+            if take_snapshot:
+                import snapshots
+                with st.spinner("Creando respaldo..."):
+                    snapshot = snapshots.create_snapshot(f"Antes de cargar {upload_type}: {uploaded_file.name}")
+                st.caption(f"📸 Respaldo creado: {os.path.basename(snapshot['path'])}")
+        
+        import_mode = st.radio(
+            "Modo de carga:",
+            ["➕ Agregar filas nuevas", "🔄 Sincronizar por id"],
+            horizontal=True,
+            help="Sincronizar compara cada fila (por su columna id) con lo guardado y solo escribe las diferencias"
+        )
+        sync_mode = import_mode == "🔄 Sincronizar por id"
+        
+        # Whole-file validation before any write, repeated only when the file or mode changes.
+        # Keyed on the content: a corrected file may keep the same name and size
+        file_digest = hashlib.md5(uploaded_file.getvalue()).hexdigest()
+        preflight_file = (file_digest, upload_type, sync_mode)
+        if st.session_state.get("preflight_file") != preflight_file:
+            with st.spinner("Validando el archivo..."):
+                st.session_state["preflight"] = csv_import.preflight_csv(uploaded_file, upload_type, sync=sync_mode)
+            st.session_state["preflight_file"] = preflight_file
+        preflight = st.session_state["preflight"]
+        
+        st.markdown("### 🔎 Validación previa")
+        if preflight['errors']:
+            st.error(f"❌ {len(preflight['errors'])} errores en {preflight['rows']} filas. Corrige el archivo antes de cargarlo.")
+            st.dataframe(pd.DataFrame(preflight['errors']))
+        else:
+            st.success(f"✅ {preflight['rows']} filas sin errores")
+        if preflight['warnings']:
+            st.warning(f"⚠️ {len(preflight['warnings'])} advertencias (no impiden la carga)")
+            st.dataframe(pd.DataFrame(preflight['warnings']))
+        if preflight['errors'] or preflight['warnings']:
+            st.download_button(
+                "📄 Descargar reporte de validación",
+                data=csv_import.errors_to_csv(preflight['errors'] + preflight['warnings']),
+                file_name="reporte_validacion.csv",
+                mime="text/csv"
+            )
+        st.caption(f"Validado en {preflight['elapsed'] * 1000:.0f} ms")
+        
+        if sync_mode:
+            delete_missing = st.checkbox(
+                "Eliminar las filas guardadas que ya no están en el archivo",
+                help="Solo dentro de los mismos padres que aparecen en el archivo (p. ej. los desafíos de sus lecciones)"
+            )
+            
+            if st.button("🔍 Ver cambios", disabled=bool(preflight['errors'])):
+                with st.spinner("Comparando con la base de datos..."):
+                    st.session_state["sync_preview"] = csv_import.sync_csv(uploaded_file, upload_type)
+                st.session_state["sync_preview_file"] = (file_digest, upload_type)
+                uploaded_file.seek(0)
+            
+            sync_preview = st.session_state.get("sync_preview")
+            if sync_preview and st.session_state.get("sync_preview_file") == (file_digest, upload_type):
+                if sync_preview['errors']:
+                    st.error(f"❌ Se encontraron {len(sync_preview['errors'])} errores en {sync_preview['rows']} filas.")
+                    st.dataframe(pd.DataFrame(sync_preview['errors']))
+                    st.download_button(
+                        "📄 Descargar reporte de errores",
+                        data=csv_import.errors_to_csv(sync_preview['errors']),
+                        file_name="reporte_errores.csv",
+                        mime="text/csv"
+                    )
+                else:
+                    col1, col2, col3, col4 = st.columns(4)
+                    with col1:
+                        st.metric("Nuevas", sync_preview['inserted'])
+                    with col2:
+                        st.metric("Modificadas", sync_preview['updated'])
+                    with col3:
+                        st.metric("Sin cambios", sync_preview['unchanged'])
+                    with col4:
+                        st.metric("Eliminadas" if delete_missing else "No están en el archivo", sync_preview['deleted'])
+                    
+                    action_labels = {"insert": "➕ Nueva", "update": "✏️ Modificada", "delete": "🗑️ Eliminada"}
+                    changes = [c for c in sync_preview['changes'] if delete_missing or c['action'] != "delete"]
+                    if changes:
+                        st.dataframe(pd.DataFrame([{
+                            'Acción': action_labels[c['action']],
+                            'Fila': c['row'],
+                            'ID': c['id'],
+                            'Detalle': c['detail'],
+                        } for c in changes]))
+                        
+                        if st.button("✅ Aplicar cambios"):
+                            snapshot_before_write()
+                            result = csv_import.sync_csv(uploaded_file, upload_type, apply=True, delete_missing=delete_missing)
+                            st.session_state.pop("sync_preview", None)
+                            if result['errors']:
+                                st.error(f"❌ Se encontraron {len(result['errors'])} errores. No se guardó ningún dato.")
+                                st.dataframe(pd.DataFrame(result['errors']))
+                            else:
+                                st.success(
+                                    f"✅ Sincronización completada en {result['elapsed']:.1f} s: "
+                                    f"{result['inserted']} nuevas, {result['updated']} modificadas, {result['deleted']} eliminadas"
+                                )
+                    else:
+                        st.info("El archivo coincide con lo guardado: no hay cambios que aplicar")
+        
+        elif st.button("✅ Confirmar y cargar datos", disabled=bool(preflight['errors'])):
+            snapshot_before_write()
+            progress_bar = st.progress(0)
+            status_text = st.empty()
+            
+            def report_progress(rows, fraction):
+                progress_bar.progress(fraction)
+                status_text.text(f"Procesando: {rows} filas leídas")
+            
+            result = csv_import.import_csv(uploaded_file, upload_type, on_progress=report_progress)
+            
+            if result['errors']:
+                st.error(f"❌ Se encontraron {len(result['errors'])} errores en {result['rows']} filas. No se guardó ningún dato.")
+                st.dataframe(pd.DataFrame(result['errors']))
+                st.download_button(
+                    "📄 Descargar reporte de errores",
+                    data=csv_import.errors_to_csv(result['errors']),
+                    file_name="reporte_errores.csv",
+                    mime="text/csv"
+                )
+            else:
+                st.success(f"✅ Carga completada: {result['inserted']} filas guardadas en {result['elapsed']:.1f} s")
+            
+    except Exception as e:
+        st.error(f"Error al procesar el archivo: {str(e)}")
+
+common.footer()
@@ -0,0 +1,73 @@
+"""
+FIBRA Content Management System
+Content snapshot and restore page
+"""
+
+import streamlit as st
+import sys
+import os
+
+# Add the application directory to path for imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import common
+import snapshots
+
+common.setup_page("Respaldos · FIBRA CMS")
+
+st.markdown("## Respaldos de Contenido")
+
+st.info("""
+Un respaldo guarda cursos, unidades, lecciones, desafíos, opciones y exámenes en un archivo local comprimido.
+Restaurarlo devuelve todo el contenido a ese momento en una sola transacción: recupera lo eliminado o modificado
+y elimina lo creado después. La Carga Masiva crea uno automáticamente antes de guardar.
+""")
+
+st.markdown("### 📸 Crear respaldo")
+label = st.text_input("Descripción (opcional)", placeholder="Antes de reorganizar la unidad 3")
+if st.button("📸 Crear respaldo ahora"):
+    try:
+        with st.spinner("Creando respaldo..."):
+            snapshot = snapshots.create_snapshot(label)
+        rows = sum(t['rows'] for t in snapshot['tables'].values())
+        st.success(f"✅ Respaldo creado: {rows} filas, {snapshot['bytes'] / 1024:.0f} KB en {snapshot['elapsed']:.1f} s")
+    except Exception as e:
+        st.error(f"Error al crear el respaldo: {str(e)}")
+
+st.markdown("### ♻️ Respaldos disponibles")
+available = snapshots.list_snapshots()
+if not available:
+    st.info("No hay respaldos todavía")
+
+for snapshot in available:
+    rows = sum(t['rows'] for t in snapshot['tables'].values())
+    title = f"{snapshot['created_at'].replace('T', ' ')} · {snapshot['label'] or 'Sin descripción'}"
+    with st.expander(title):
+        tables = snapshot['tables']
+        st.write(
+            f"**Cursos:** {tables['courses']['rows']} · **Unidades:** {tables['units']['rows']} · "
+            f"**Lecciones:** {tables['lessons']['rows']} · **Desafíos:** {tables['challenges']['rows']} · "
+            f"**Opciones:** {tables['challenge_options']['rows']} · **Exámenes:** {tables['exams']['rows']}"
+        )
+        st.caption(f"{rows} filas · {snapshot['bytes'] / 1024:.0f} KB · {os.path.basename(snapshot['path'])}")
+
+        key = os.path.basename(snapshot['path'])
+        confirm = st.checkbox("Entiendo que el contenido actual se reemplazará por este respaldo", key=f"confirm_{key}")
+        col1, col2 = st.columns(2)
+        with col1:
+            if st.button("♻️ Restaurar", key=f"restore_{key}", disabled=not confirm):
+                try:
+                    with st.spinner("Restaurando..."):
+                        result = snapshots.restore_snapshot(snapshot['path'])
+                    st.success(
+                        f"✅ Respaldo restaurado en {result['elapsed']:.1f} s: "
+                        f"{sum(result['written'].values())} filas restauradas, {sum(result['deleted'].values())} eliminadas"
+                    )
+                except Exception as e:
+                    st.error(f"Error al restaurar: {str(e)}")
+        with col2:
+            if st.button("🗑️ Eliminar respaldo", key=f"delete_{key}"):
+                snapshots.delete_snapshot(snapshot['path'])
+                st.rerun()
+
+common.footer()
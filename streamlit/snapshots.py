@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Content snapshots for FIBRA Content Management System
+Saves the content tables to a compact local file (a zip with one binary
+COPY stream per table) and restores them in one transaction, so a bulk
+upload or mass delete can be rolled back in seconds.
+
+Restore brings every content row back to its snapshot state (upsert by id)
+and deletes content rows created afterwards. User progress on rows that were
+deleted after the snapshot is not part of the snapshot and is not restored.
+
+Usage:
+    python snapshots.py create [--label "antes de la carga"]
+    python snapshots.py list
+    python snapshots.py restore snapshots/contenido_20250101_120000_000000.zip
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+import zipfile
+from datetime import datetime
+from typing import List, Dict, Optional, Any, Callable
+
+import db_utils
+
+SNAPSHOT_DIR = os.getenv('SNAPSHOT_DIR', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'snapshots'))
+MANIFEST = "manifest.json"
+
+# Parents before children; restore deletes in the reverse order
+SNAPSHOT_TABLES = ('courses', 'units', 'lessons', 'challenges', 'challenge_options', 'exams', 'exam_lessons')
+
+def _quote(column: str) -> str:
+    return f'"{column}"'
+
+def create_snapshot(label: str = "", on_progress: Optional[Callable[[str, int], None]] = None) -> Dict[str, Any]:
+    """Save every content table to a new snapshot file in SNAPSHOT_DIR.
+
+    All tables are read from one repeatable-read snapshot of the database.
+    Returns the manifest plus `path`, `bytes` and `elapsed` seconds.
+    """
+    start = time.perf_counter()
+    os.makedirs(SNAPSHOT_DIR, exist_ok=True)
+    created_at = datetime.now()
+    path = os.path.join(SNAPSHOT_DIR, f"contenido_{created_at:%Y%m%d_%H%M%S_%f}.zip")
+    manifest = {"label": label, "created_at": created_at.isoformat(timespec="seconds"), "tables": {}}
+
+    try:
+        _write_snapshot(path, manifest, on_progress)
+    except Exception:
+        # Never leave a half-written snapshot behind
+        if os.path.exists(path):
+            os.remove(path)
+        raise
+
+    return {**manifest, "path": path, "bytes": os.path.getsize(path), "elapsed": time.perf_counter() - start}
+
+def _write_snapshot(path: str, manifest: Dict[str, Any], on_progress: Optional[Callable[[str, int], None]]):
+    with db_utils.transaction() as session, \
+            zipfile.ZipFile(path, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+        session.execute("SET TRANSACTION ISOLATION LEVEL REPEATABLE READ READ ONLY")
+        for table in SNAPSHOT_TABLES:
+            # Generated columns (e.g. search_vector) are recomputed on restore
+            session.execute(
+                "SELECT attname FROM pg_attribute WHERE attrelid = %s::regclass "
+                "AND attnum > 0 AND NOT attisdropped AND attgenerated = '' ORDER BY attnum",
+                (table,)
+            )
+            columns = [r["attname"] for r in session.fetchall()]
+            with archive.open(f"{table}.copy", "w", force_zip64=True) as out:
+                session.copy_expert(
+                    f"COPY {table} ({', '.join(_quote(c) for c in columns)}) TO STDOUT WITH (FORMAT binary)",
+                    out
+                )
+            rows = session.rowcount
+            session.execute(
+                "SELECT COALESCE(last_value, 0) AS last_value FROM pg_sequences "
+                "WHERE (schemaname || '.' || sequencename)::regclass = pg_get_serial_sequence(%s, 'id')::regclass",
+                (table,)
+            )
+            manifest["tables"][table] = {"columns": columns, "rows": rows, "sequence": session.fetchone()["last_value"]}
+            if on_progress:
+                on_progress(table, rows)
+        archive.writestr(MANIFEST, json.dumps(manifest, ensure_ascii=False, indent=2))
+
+def read_manifest(path: str) -> Dict[str, Any]:
+    """Read the manifest of a snapshot file"""
+    with zipfile.ZipFile(path) as archive:
+        return json.loads(archive.read(MANIFEST))
+
+def list_snapshots() -> List[Dict[str, Any]]:
+    """Snapshots in SNAPSHOT_DIR, newest first: manifest plus path and bytes"""
+    if not os.path.isdir(SNAPSHOT_DIR):
+        return []
+    snapshots = []
+    for name in os.listdir(SNAPSHOT_DIR):
+        path = os.path.join(SNAPSHOT_DIR, name)
+        if not name.endswith(".zip"):
+            continue
+        try:
+            manifest = read_manifest(path)
+        except (zipfile.BadZipFile, KeyError, ValueError):
+            continue
+        snapshots.append({**manifest, "path": path, "bytes": os.path.getsize(path)})
+    return sorted(snapshots, key=lambda s: s["created_at"], reverse=True)
+
+def delete_snapshot(path: str):
+    """Delete a snapshot file"""
+    os.remove(path)
+
+def restore_snapshot(path: str, on_progress: Optional[Callable[[str, int], None]] = None) -> Dict[str, Any]:
+    """Bring the content tables back to a snapshot in one transaction.
+
+    Each table is loaded into a temporary table, rows that differ are
+    upserted by id (parents first) and rows missing from the snapshot are
+    deleted (children first). Sequences never move backwards. Returns a
+    dict with `written` and `deleted` row counts per table and `elapsed`
+    seconds.
+    """
+    start = time.perf_counter()
+    manifest = read_manifest(path)
+    result = {"written": {}, "deleted": {}, "elapsed": 0.0}
+
+    with db_utils.transaction() as session, zipfile.ZipFile(path) as archive:
+        for table in SNAPSHOT_TABLES:
+            columns = manifest["tables"][table]["columns"]
+            quoted = ", ".join(_quote(c) for c in columns)
+            data = [c for c in columns if c != "id"]
+            session.execute(f"CREATE TEMP TABLE restore_{table} (LIKE {table}) ON COMMIT DROP")
+            with archive.open(f"{table}.copy") as source:
+                session.copy_expert(f"COPY restore_{table} ({quoted}) FROM STDIN WITH (FORMAT binary)", source)
+            session.execute(
+                f"INSERT INTO {table} ({quoted}) SELECT {quoted} FROM restore_{table} "
+                f"ON CONFLICT (id) DO UPDATE SET "
+                + ", ".join(f"{_quote(c)} = EXCLUDED.{_quote(c)}" for c in data)
+                + f" WHERE ({', '.join(f'{table}.{_quote(c)}' for c in data)}) "
+                f"IS DISTINCT FROM ({', '.join(f'EXCLUDED.{_quote(c)}' for c in data)})"
+            )
+            result["written"][table] = session.rowcount
+            if on_progress:
+                on_progress(table, session.rowcount)
+
+        for table in reversed(SNAPSHOT_TABLES):
+            session.execute(
+                f"DELETE FROM {table} t WHERE NOT EXISTS (SELECT 1 FROM restore_{table} r WHERE r.id = t.id)"
+            )
+            result["deleted"][table] = session.rowcount
+            session.execute(
+                f"SELECT setval(pg_get_serial_sequence(%s, 'id'), "
+                f"GREATEST(%s, (SELECT COALESCE(MAX(id), 0) FROM {table}), 1))",
+                (table, manifest["tables"][table]["sequence"])
+            )
+
+        for table in db_utils.CONTENT_TABLES:
+            db_utils.invalidate(table, session=session)
+
+    result["elapsed"] = time.perf_counter() - start
+    return result
+
+def main():
+    parser = argparse.ArgumentParser(description="Respaldos rápidos de las tablas de contenido")
+    commands = parser.add_subparsers(dest="command", required=True)
+    create = commands.add_parser("create", help="crear un respaldo")
+    create.add_argument("--label", default="", help="descripción del respaldo")
+    commands.add_parser("list", help="listar respaldos")
+    restore = commands.add_parser("restore", help="restaurar un respaldo")
+    restore.add_argument("path", help="archivo del respaldo")
+    args = parser.parse_args()
+
+    def report(table, rows):
+        print(f"  {table:<20} {rows:>10} filas")
+
+    if args.command == "create":
+        snapshot = create_snapshot(args.label, report)
+        print(f"Respaldo creado: {snapshot['path']} ({snapshot['bytes'] / 1024:.0f} KB en {snapshot['elapsed']:.2f} s)")
+    elif args.command == "list":
+        for snapshot in list_snapshots():
+            rows = sum(t["rows"] for t in snapshot["tables"].values())
+            print(f"{snapshot['created_at']}  {rows:>8} filas  {snapshot['bytes'] / 1024:>8.0f} KB  {snapshot['path']}  {snapshot['label']}")
+    else:
+        result = restore_snapshot(args.path, report)
+        print(
+            f"Respaldo restaurado en {result['elapsed']:.2f} s: "
+            f"{sum(result['written'].values())} filas restauradas, {sum(result['deleted'].values())} eliminadas"
+        )
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())